@@ -0,0 +1,43 @@
+"""индексы под фильтры маршрутов (CREATE INDEX CONCURRENTLY)
+
+Revision ID: 0d75d06c4719
+Revises: 75ddcdcb7f53
+Create Date: 2026-10-17 11:02:17.553061
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d75d06c4719'
+down_revision: Union[str, Sequence[str], None] = '75ddcdcb7f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# имя индекса -> (таблица, колонки); проверка использования: GET /admin/explain-indexes
+INDEXES = {
+    'ix_платеж_статус_срок_оплаты': ('платеж', ['статус', 'срок_оплаты']),
+    'ix_договор_id_арендатора': ('договор', ['id_арендатора']),
+    'ix_бронь_id_арендатора': ('бронь', ['id_арендатора']),
+    'ix_бронь_офис_период': ('бронь', ['id_офиса', 'начало_брони', 'окончание_брони']),
+    'ix_заявка_договор_дата_статус': ('заявка', ['id_договора', 'дата_подачи', 'статус']),
+    'ix_офис_статус_этаж': ('офис', ['статус', 'этаж']),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in INDEXES.items():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, (table, _) in INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
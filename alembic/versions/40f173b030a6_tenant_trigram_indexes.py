@@ -0,0 +1,46 @@
+"""триграммные GIN-индексы для поиска арендаторов
+
+Revision ID: 40f173b030a6
+Revises: 0d75d06c4719
+Create Date: 2026-10-17 11:41:09.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40f173b030a6'
+down_revision: Union[str, Sequence[str], None] = '0d75d06c4719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_арендатор_название_trgm': 'название_компании',
+    'ix_арендатор_контакт_trgm': 'контактное_лицо',
+    'ix_арендатор_телефон_trgm': 'телефон',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Для кириллицы база должна иметь UTF-8 LC_CTYPE (например ru_RU.UTF-8 или C.UTF-8):
+    # в локали C pg_trgm не считает русские буквы символами слов
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # gin_trgm_ops обслуживает и ILIKE '%...%', и операторы сходства % / <%
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES.items():
+            op.create_index(
+                name, 'арендатор', [column],
+                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='арендатор', postgresql_concurrently=True, if_exists=True)
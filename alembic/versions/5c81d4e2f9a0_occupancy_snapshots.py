@@ -0,0 +1,38 @@
+"""ежедневные снимки заполненности по этажам
+
+Revision ID: 5c81d4e2f9a0
+Revises: 9b3e51c0a7d2
+Create Date: 2026-10-17 13:48:37.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c81d4e2f9a0'
+down_revision: Union[str, Sequence[str], None] = '9b3e51c0a7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'заполненность',
+        sa.Column('дата', sa.Date(), nullable=False),
+        sa.Column('этаж', sa.Integer(), nullable=False),
+        sa.Column('офисов', sa.Integer(), nullable=False),
+        sa.Column('площадь_всего', sa.Integer(), nullable=False),
+        sa.Column('площадь_арендуется', sa.Integer(), nullable=False),
+        sa.Column('площадь_в_резерве', sa.Integer(), nullable=False),
+        sa.Column('площадь_на_обслуживании', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('дата', 'этаж'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('заполненность')
@@ -0,0 +1,41 @@
+"""запрет пересечения броней одного офиса (GiST exclusion constraint)
+
+Revision ID: 75ddcdcb7f53
+Revises: 43d848446d38
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '75ddcdcb7f53'
+down_revision: Union[str, Sequence[str], None] = '43d848446d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist нужен, чтобы сравнивать id_офиса через "=" внутри GiST-индекса
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # Если в таблице уже есть пересекающиеся брони, миграция упадёт —
+    # их нужно разобрать вручную до применения
+    op.execute(
+        """
+        ALTER TABLE бронь
+        ADD CONSTRAINT бронь_без_пересечений
+        EXCLUDE USING gist (
+            id_офиса WITH =,
+            daterange(начало_брони, окончание_брони, '[)') WITH &&
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('бронь_без_пересечений', 'бронь')
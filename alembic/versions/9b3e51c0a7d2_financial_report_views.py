@@ -0,0 +1,69 @@
+"""материализованные представления финансовых отчётов
+
+Revision ID: 9b3e51c0a7d2
+Revises: f75cd2eaa8ad
+Create Date: 2026-10-17 13:05:12.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e51c0a7d2'
+down_revision: Union[str, Sequence[str], None] = 'f75cd2eaa8ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'отчет_состояние',
+        sa.Column('отчет', sa.String(length=50), nullable=False),
+        sa.Column('метка', sa.String(length=200), nullable=False),
+        sa.Column('обновлено_в', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('отчет'),
+    )
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS отчет_выручка AS
+        SELECT date_trunc('month', coalesce(п.дата_платежа, п.срок_оплаты))::date AS месяц,
+               о.этаж,
+               д.id_арендатора,
+               sum(п.сумма)::bigint AS сумма,
+               count(*) AS количество
+        FROM платеж п
+        JOIN договор д ON д.id_договора = п.id_договора
+        JOIN офис о ON о.id_офиса = д.id_офиса
+        WHERE п.статус = 'оплачен'
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS отчет_задолженность AS
+        SELECT о.этаж,
+               д.id_арендатора,
+               coalesce(sum(п.сумма) FILTER (WHERE п.срок_оплаты >= current_date), 0)::bigint AS не_наступил,
+               coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 1 AND 30), 0)::bigint AS до_30,
+               coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 31 AND 60), 0)::bigint AS от_31_до_60,
+               coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 61 AND 90), 0)::bigint AS от_61_до_90,
+               coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты > 90), 0)::bigint AS свыше_90,
+               sum(п.сумма)::bigint AS итого,
+               count(*) AS количество
+        FROM платеж п
+        JOIN договор д ON д.id_договора = п.id_договора
+        JOIN офис о ON о.id_офиса = д.id_офиса
+        WHERE п.статус IN ('не оплачен', 'просрочен')
+        GROUP BY 1, 2
+    """)
+    # Уникальные индексы нужны для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_отчет_выручка ON отчет_выручка (месяц, этаж, id_арендатора)")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_отчет_задолженность ON отчет_задолженность (этаж, id_арендатора)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS отчет_задолженность")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS отчет_выручка")
+    op.drop_table('отчет_состояние')
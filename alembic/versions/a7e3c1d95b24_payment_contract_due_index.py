@@ -0,0 +1,28 @@
+"""индекс платежей по договору и сроку оплаты для графиков платежей
+
+Revision ID: a7e3c1d95b24
+Revises: 5c81d4e2f9a0
+Create Date: 2026-10-17 15:02:11.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c1d95b24'
+down_revision: Union[str, Sequence[str], None] = '5c81d4e2f9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_платеж_договор_срок', 'платеж', ['id_договора', 'срок_оплаты'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_платеж_договор_срок', table_name='платеж')
@@ -0,0 +1,83 @@
+"""слоты счётчиков версий таблиц: запись без ожидания чужих транзакций
+
+Revision ID: b6e4d2f8a915
+Revises: d4b8f2a61c37
+Create Date: 2026-10-17 21:06:52.184306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e4d2f8a915'
+down_revision: Union[str, Sequence[str], None] = 'd4b8f2a61c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Один счётчик на таблицу сериализовал все пишущие транзакции по ней до коммита.
+    # Теперь версия таблицы — сумма строк-слотов: триггер берёт слот, не занятый другой
+    # транзакцией, а если заняты все — добавляет новый. Лишние слоты сворачивает
+    # etag.compact_table_versions. IF NOT EXISTS — для баз, где слот уже добавлен
+    # прежней редакцией d4b8f2a61c37
+    op.execute("CREATE SEQUENCE IF NOT EXISTS версия_таблицы_слот_seq")
+    op.execute("ALTER TABLE версия_таблицы ADD COLUMN IF NOT EXISTS слот bigint")
+    op.execute("""
+        SELECT setval('версия_таблицы_слот_seq', coalesce(max(слот), 0) + 1, false)
+        FROM версия_таблицы
+    """)
+    op.execute("UPDATE версия_таблицы SET слот = nextval('версия_таблицы_слот_seq') WHERE слот IS NULL")
+    op.execute("""
+        ALTER TABLE версия_таблицы
+            ALTER COLUMN слот SET DEFAULT nextval('версия_таблицы_слот_seq'),
+            ALTER COLUMN слот SET NOT NULL
+    """)
+    op.execute("ALTER SEQUENCE версия_таблицы_слот_seq OWNED BY версия_таблицы.слот")
+    op.execute("ALTER TABLE версия_таблицы DROP CONSTRAINT версия_таблицы_pkey")
+    op.create_primary_key('версия_таблицы_pkey', 'версия_таблицы', ['таблица', 'слот'])
+    op.execute("""
+        CREATE OR REPLACE FUNCTION увеличить_версию_таблицы() RETURNS trigger AS $$
+        BEGIN
+            UPDATE версия_таблицы SET версия = версия + 1
+            WHERE (таблица, слот) = (
+                SELECT таблица, слот FROM версия_таблицы
+                WHERE таблица = TG_TABLE_NAME
+                ORDER BY слот LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            );
+            IF NOT FOUND THEN
+                INSERT INTO версия_таблицы (таблица, версия) VALUES (TG_TABLE_NAME, 1);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Слоты сворачиваются в один счётчик на таблицу
+    op.execute("""
+        WITH итог AS (
+            DELETE FROM версия_таблицы RETURNING таблица, версия
+        )
+        INSERT INTO версия_таблицы (таблица, слот, версия)
+        SELECT таблица, 0, sum(версия) FROM итог GROUP BY таблица
+    """)
+    op.execute("ALTER TABLE версия_таблицы DROP CONSTRAINT версия_таблицы_pkey")
+    op.drop_column('версия_таблицы', 'слот')
+    op.create_primary_key('версия_таблицы_pkey', 'версия_таблицы', ['таблица'])
+    op.execute("""
+        CREATE OR REPLACE FUNCTION увеличить_версию_таблицы() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO версия_таблицы (таблица, версия) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (таблица) DO UPDATE SET версия = версия_таблицы.версия + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
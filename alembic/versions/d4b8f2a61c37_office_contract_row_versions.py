@@ -0,0 +1,30 @@
+"""версии строк офисов и договоров для оптимистичной блокировки
+
+Revision ID: d4b8f2a61c37
+Revises: a7e3c1d95b24
+Create Date: 2026-10-17 15:41:26.093518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8f2a61c37'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c1d95b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('офис', sa.Column('версия', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('договор', sa.Column('версия', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('договор', 'версия')
+    op.drop_column('офис', 'версия')
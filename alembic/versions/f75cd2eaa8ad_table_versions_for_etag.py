@@ -0,0 +1,55 @@
+"""счётчики версий таблиц для ETag
+
+Revision ID: f75cd2eaa8ad
+Revises: 40f173b030a6
+Create Date: 2026-10-17 12:20:41.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f75cd2eaa8ad'
+down_revision: Union[str, Sequence[str], None] = '40f173b030a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('арендатор', 'офис', 'договор', 'платеж', 'заявка', 'бронь')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'версия_таблицы',
+        sa.Column('таблица', sa.String(length=63), nullable=False),
+        sa.Column('версия', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('таблица'),
+    )
+    # Счётчик меняется в транзакции пишущего запроса: читатели не увидят новую версию
+    # раньше данных. Цена — строка счётчика блокируется до коммита этой транзакции.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION увеличить_версию_таблицы() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO версия_таблицы (таблица, версия) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (таблица) DO UPDATE SET версия = версия_таблицы.версия + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in TABLES:
+        op.execute(
+            f"CREATE OR REPLACE TRIGGER версия_{table} "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION увеличить_версию_таблицы()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS версия_{table} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS увеличить_версию_таблицы()")
+    op.drop_table('версия_таблицы')
@@ -0,0 +1,154 @@
+# app/bulk.py
+import csv
+import io
+from itertools import islice
+
+import orjson
+import psycopg2
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+
+from backend.app.config import settings
+
+# Массовая загрузка строк из CSV или NDJSON.
+# Строки проверяются пачками: сначала схемой Pydantic, затем проверками маршрута
+# (одним запросом на пачку), и пишутся в одной транзакции, каждая пачка — в своей
+# точке сохранения. Ошибочные строки не останавливают загрузку, а попадают в ответ
+# с номером строки файла — в том числе отвергнутые самой БД (внешний ключ, уникальность,
+# CHECK), которые проверки маршрута не поймали.
+BULK_BATCH_SIZE = 1000
+
+CSV_TYPES = ("text/csv",)
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def parse_rows(body: bytes, content_type: str):
+    """Пары (номер строки файла, dict) или (номер строки, текст ошибки разбора)."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CSV_TYPES + NDJSON_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Поддерживаются только text/csv и application/x-ndjson"
+        )
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Файл должен быть в кодировке UTF-8")
+
+    rows = _csv_rows(text) if media_type in CSV_TYPES else _ndjson_rows(text)
+    return _limited(rows, settings.bulk_max_rows)
+
+
+def _csv_rows(text: str):
+    # Первая строка — заголовок с именами полей схемы; пустая ячейка = null
+    reader = csv.DictReader(io.StringIO(text))
+    for row in reader:
+        if None in row:
+            yield reader.line_num, "Лишние значения в строке"
+            continue
+        yield reader.line_num, {key: (value if value != "" else None) for key, value in row.items()}
+
+
+def _ndjson_rows(text: str):
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_no, "Некорректный JSON"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, "Ожидается JSON-объект"
+            continue
+        yield line_no, row
+
+
+def _limited(rows, max_rows: int):
+    for count, row in enumerate(rows, start=1):
+        if count > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Слишком много строк (максимум {max_rows})"
+            )
+        yield row
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+def ingest(db, rows, schema, check_batch, insert_batch, strict: bool = False):
+    """
+    Проверяет и загружает строки пачками по BULK_BATCH_SIZE в одной транзакции.
+
+    check_batch(db, [(номер, модель)], errors) -> прошедшие проверку пары;
+    insert_batch(db, [модель]) пишет пачку в БД.
+    strict=True — при любой ошибке транзакция откатывается и не загружается ничего.
+    """
+    loaded = 0
+    errors = []
+    rows = iter(rows)
+    while batch := list(islice(rows, BULK_BATCH_SIZE)):
+        valid = []
+        for line_no, row in batch:
+            if isinstance(row, str):
+                errors.append({"строка": line_no, "ошибка": row})
+                continue
+            try:
+                valid.append((line_no, schema.model_validate(row)))
+            except ValidationError as e:
+                errors.append({"строка": line_no, "ошибка": _format_validation_error(e)})
+
+        valid = check_batch(db, valid, errors) if valid else valid
+        if valid:
+            loaded += _insert_rows(db, valid, insert_batch, errors)
+
+    if strict and errors:
+        db.rollback()
+        loaded = 0
+    else:
+        db.commit()
+    errors.sort(key=lambda error: error["строка"])
+    return {"загружено": loaded, "ошибки": errors}
+
+
+def _insert_rows(db, rows, insert_batch, errors) -> int:
+    """
+    Пишет пары (номер, модель) в точке сохранения и возвращает число записанных.
+    Если БД отвергла пачку, откатывается только она, а строки пишутся по одной,
+    чтобы найти виновные; остальные строки пачки загружаются.
+    """
+    try:
+        with db.begin_nested():
+            insert_batch(db, [item for _, item in rows])
+        return len(rows)
+    except (DBAPIError, psycopg2.Error) as e:
+        if len(rows) == 1:
+            errors.append({"строка": rows[0][0], "ошибка": f"Отклонено базой данных: {_db_error_message(e)}"})
+            return 0
+    return sum(_insert_rows(db, [row], insert_batch, errors) for row in rows)
+
+
+def _db_error_message(e) -> str:
+    orig = getattr(e, "orig", e)
+    diag = getattr(orig, "diag", None)
+    if diag is not None and diag.message_primary:
+        return diag.message_primary
+    return str(orig).strip()
+
+
+def copy_rows(db, table: str, columns, rows):
+    """Пишет кортежи через COPY ... FROM STDIN в текущей транзакции сессии (psycopg2)."""
+    buffer = io.StringIO()
+    # В формате csv пустое поле без кавычек — NULL, None пишется именно так
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
@@ -0,0 +1,205 @@
+# app/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+
+from backend.app.config import settings
+
+
+class MemoryCache:
+    """
+    Кэш в памяти процесса: LRU с ограничением по размеру и TTL на каждую запись.
+    Счётчики (incr) хранятся отдельно и не вытесняются. Инвалидация видна только
+    своему процессу, поэтому при нескольких воркерах лучше Redis.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCache:
+    """
+    Кэш поверх Redis-совместимого клиента (redis.Redis, fakeredis.FakeRedis и т.п.).
+    От клиента нужны только get / set(ex=) / delete / incr.
+    """
+
+    def __init__(self, client, prefix: str = "crm:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Для CACHE_BACKEND=redis установите пакет redis")
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+
+class NullCache:
+    """Кэш выключен: ничего не хранит."""
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def incr(self, key: str) -> int:
+        return 0
+
+
+def build_cache():
+    if settings.cache_backend == "memory":
+        return MemoryCache(settings.cache_maxsize)
+    if settings.cache_backend == "redis":
+        return RedisCache.from_url(settings.cache_url)
+    return NullCache()
+
+
+cache = build_cache()
+
+
+# --------------------------
+# Каталог офисов
+# --------------------------
+# Списки кэшируются по фильтру (статус, этаж). У каждого фильтра есть счётчик поколения:
+# при изменении офиса увеличиваются счётчики только тех фильтров, в выдачу которых
+# этот офис попадал или попадёт, и их старые страницы перестают читаться.
+# Инвалидация видна только своему процессу, поэтому каждая запись хранит ещё и версии
+# таблиц из БД (etag.versions_tag), при которых собрана, и читается только при тех же версиях.
+
+def _office_key(office_id: int) -> str:
+    return f"office:{office_id}"
+
+
+def _office_list_generation_key(status: Optional[str], floor: Optional[int]) -> str:
+    return f"offices:gen:{status or '*'}:{floor or '*'}"
+
+
+def office_list_key(status: Optional[str], floor: Optional[int], limit: int, after: Optional[int]) -> str:
+    generation = cache.get(_office_list_generation_key(status, floor)) or b"0"
+    return f"offices:list:{status or '*'}:{floor or '*'}:{generation.decode()}:{limit}:{after or 0}"
+
+
+def _get_versioned(key: str, versions: str):
+    raw = cache.get(key)
+    if raw is None:
+        return None
+    entry = orjson.loads(raw)
+    return entry if entry["versions"] == versions else None
+
+
+def get_cached_office(office_id: int, versions: str):
+    """(True, офис или None для 404) при попадании, (False, None) при промахе."""
+    entry = _get_versioned(_office_key(office_id), versions)
+    if entry is None:
+        return False, None
+    return True, entry["office"]
+
+
+def cache_office(office_id: int, office: Optional[dict], versions: str):
+    # Отсутствующий офис тоже кэшируем, но ненадолго
+    ttl = settings.cache_ttl if office is not None else settings.cache_negative_ttl
+    cache.set(_office_key(office_id), orjson.dumps({"office": office, "versions": versions}), ttl)
+
+
+# Ключ списка вычисляется один раз до запроса в БД: если поколение сменится
+# во время запроса, результат ляжет под старый ключ и читаться уже не будет
+def get_cached_office_list(key: str, versions: str):
+    return _get_versioned(key, versions)
+
+
+def cache_office_list(key: str, items: list, next_cursor: Optional[str], versions: str):
+    cache.set(key, orjson.dumps({"items": items, "next": next_cursor, "versions": versions}), settings.cache_ttl)
+
+
+def invalidate_office(office_id: int, *states):
+    """
+    Сбрасывает кэш офиса и списков, затронутых изменением.
+    states — пары (статус, этаж) офиса до и/или после записи.
+    """
+    invalidate_offices([office_id], states)
+
+
+def invalidate_offices(office_ids, states):
+    """То же для многих офисов сразу (массовая загрузка): каждое поколение увеличивается один раз."""
+    cache.delete(*(_office_key(office_id) for office_id in office_ids))
+    filters = set()
+    for status, floor in states:
+        for status_filter in (None, status):
+            for floor_filter in (None, floor):
+                filters.add((status_filter, floor_filter))
+    for status_filter, floor_filter in filters:
+        cache.incr(_office_list_generation_key(status_filter, floor_filter))
+
+
+# --------------------------
+# Дашборд арендатора
+# --------------------------
+# Явной инвалидации нет: данные дашборда собираются из пяти таблиц,
+# поэтому запись просто живёт settings.dashboard_cache_ttl секунд.
+
+def _dashboard_key(tenant_id: int) -> str:
+    return f"dashboard:{tenant_id}"
+
+
+def get_cached_dashboard(tenant_id: int):
+    raw = cache.get(_dashboard_key(tenant_id))
+    return orjson.loads(raw) if raw is not None else None
+
+
+def cache_dashboard(tenant_id: int, dashboard: dict):
+    cache.set(_dashboard_key(tenant_id), orjson.dumps(dashboard), settings.dashboard_cache_ttl)
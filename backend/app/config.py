@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +12,67 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: int
 
+    # Хеширование паролей: число итераций pbkdf2_sha256, процессы пула
+    # (0 — считать прямо в обработчике) и сколько операций может ждать пул
+    password_hash_rounds: int = 29000
+    password_hash_workers: int = 2
+    password_hash_queue: int = 16
+
+    # Сколько проверенных токенов держать в кэше oauth2
+    token_cache_size: int = 10000
+
+    # Пагинация списков
+    page_size_default: int = 100
+    page_size_max: int = 500
+
+    # Массовая загрузка (/offices/bulk, /payments/bulk): максимум строк в одном файле
+    bulk_max_rows: int = 100000
+
+    # Пул соединений с БД
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Режим для работы за PgBouncer (pool_mode=transaction): без собственного пула
+    # и без серверных prepared statements
+    db_pgbouncer: bool = False
+
+    # Кэш каталога офисов: memory / redis / none
+    cache_backend: str = "memory"
+    cache_url: str = "redis://localhost:6379/0"
+    cache_maxsize: int = 1024
+    cache_ttl: int = 300
+    cache_negative_ttl: int = 30
+    # Дашборд арендатора (/me/dashboard) живёт в том же кэше недолго
+    dashboard_cache_ttl: int = 30
+
+    # Как часто проверять, не пора ли обновить финансовые отчёты (0 — только вручную)
+    reports_refresh_seconds: int = 300
+
+    # Как часто сворачивать слоты счётчиков версий таблиц для ETag (0 — не сворачивать)
+    table_versions_compact_seconds: int = 60
+
+    # Отдавать GET-эндпоинты через асинхронный стек (AsyncSession)
+    async_routes: bool = False
+
+    # Отдавать списки из кортежей колонок через orjson, минуя Pydantic и ORM
+    fast_lists: bool = False
+
+    # Бюджет SQL-запросов на HTTP-запрос (0 — без проверки) и исключения по маршрутам
+    # вида {"POST /bookings/": 4}; strict — падать вместо предупреждения (для тестов)
+    query_budget_default: int = 0
+    query_budgets: Dict[str, int] = {}
+    query_budget_strict: bool = False
+
+    # /metrics при нескольких воркерах: общий каталог для снимков (пусто — только свой
+    # процесс) и как часто воркер обновляет свой снимок
+    metrics_dir: str = ""
+    metrics_flush_seconds: float = 5
+
+    # Куда сохранять профили, снятые через /admin/profiler
+    profiles_dir: str = "profiles"
+
     class Config:
         env_file = ".env"
 
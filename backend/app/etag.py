@@ -0,0 +1,156 @@
+# app/etag.py
+import asyncio
+import hashlib
+import logging
+
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import BigInteger, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.app.config import settings
+from backend.app.database import SessionLocal, get_db, get_async_db
+from backend.app.models import TableVersion
+from backend.app.oauth2 import get_current_user
+
+# Условные GET-запросы (ETag / If-None-Match).
+# Тег строится не из тела ответа, а из версий таблиц, от которых зависит выдача,
+# URL с параметрами и того, кто спрашивает (выдача арендатора отфильтрована по нему).
+# Если тег клиента совпал, отвечаем 304 до выполнения эндпоинта — строки не читаются.
+ETAG_HEADER = "ETag"
+
+logger = logging.getLogger(__name__)
+
+
+def versions_stmt(tables):
+    """Версии таблиц: сумма счётчиков по слотам (см. models.TableVersion)."""
+    return select(
+        TableVersion.таблица, func.sum(TableVersion.версия).cast(BigInteger)
+    ).where(TableVersion.таблица.in_(tables)).group_by(TableVersion.таблица)
+
+
+# Слоты, которые сейчас не держит ни одна транзакция, сворачиваются в один на таблицу.
+# Сумма, то есть версия таблицы, не меняется и меняется атомарно; занятые слоты пропускаются
+# (SKIP LOCKED), так что свёртка не ждёт пишущих, а пишущие при занятых ею слотах заводят новый
+COMPACT_TABLE_VERSIONS_SQL = text("""
+    WITH свернутые AS (
+        DELETE FROM версия_таблицы
+        WHERE (таблица, слот) IN (
+            SELECT таблица, слот FROM версия_таблицы
+            WHERE таблица IN (SELECT таблица FROM версия_таблицы GROUP BY таблица HAVING count(*) > 1)
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING таблица, версия
+    )
+    INSERT INTO версия_таблицы (таблица, версия)
+    SELECT таблица, sum(версия) FROM свернутые GROUP BY таблица
+""")
+
+
+def compact_table_versions(db: Session):
+    db.execute(COMPACT_TABLE_VERSIONS_SQL)
+    db.commit()
+
+
+def _compact_once():
+    db = SessionLocal()
+    try:
+        compact_table_versions(db)
+    finally:
+        db.close()
+
+
+async def compact_loop():
+    """Свёртка слотов раз в settings.table_versions_compact_seconds (запускается в lifespan)."""
+    while True:
+        await asyncio.sleep(settings.table_versions_compact_seconds)
+        try:
+            await run_in_threadpool(_compact_once)
+        except Exception:
+            logger.exception("Не удалось свернуть слоты версий таблиц")
+
+
+# Версии читаются раньше данных: если запись закоммитится между двумя чтениями,
+# свежие данные уйдут со старым тегом и следующий запрос просто получит 200, а не 304
+def _make_etag(request: Request, current_user, tables, versions) -> str:
+    versions = dict(versions)
+    parts = [
+        request.url.path,
+        str(request.query_params),
+        f"{current_user.id}:{current_user.role}:{current_user.tenant_id}",
+        *(f"{table}={versions.get(table, 0)}" for table in sorted(tables)),
+    ]
+    return 'W/"' + hashlib.sha1("|".join(parts).encode()).hexdigest()[:20] + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or etag[2:] in tags
+
+
+def _check(request: Request, response: Response, etag: str):
+    headers = {ETAG_HEADER: etag, "Cache-Control": "private, no-cache"}
+    if _matches(request, etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def versions_tag(request: Request) -> str:
+    """
+    Версии таблиц, по которым conditional_get посчитал ETag этого запроса, — для записей кэша.
+    Тело из кэша отдаётся, только если собрано при тех же версиях: кэш в памяти не видит
+    записей других воркеров, и без этого устаревшее тело ушло бы под свежим тегом.
+    """
+    versions = getattr(request.state, "table_versions", None) or {}
+    return ",".join(f"{table}={version}" for table, version in sorted(versions.items()))
+
+
+def _with_includes(request: Request, tables, includes):
+    # include=office,tenant добавляет в выдачу строки других таблиц — их версии тоже в теге
+    if not includes:
+        return tables
+    names = (request.query_params.get("include") or "").split(",")
+    extra = [table for name in names for table in includes.get(name.strip(), ())]
+    return tuple(dict.fromkeys((*tables, *extra)))
+
+
+def conditional_get(*tables: str, includes: dict = None):
+    """
+    Зависимость для роутера: для GET-запросов считает ETag по версиям tables
+    и отвечает 304, если клиент прислал актуальный тег в If-None-Match.
+    includes — {имя include: таблицы} (см. expand.include_tables).
+    """
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        current_user=Depends(get_current_user)
+    ):
+        if request.method != "GET":
+            return
+        used = _with_includes(request, tables, includes)
+        versions = db.execute(versions_stmt(used)).all()
+        request.state.table_versions = dict(versions)
+        _check(request, response, _make_etag(request, current_user, used, versions))
+    return dependency
+
+
+def conditional_get_async(*tables: str, includes: dict = None):
+    """То же для асинхронных эндпоинтов (routes/read_async.py)."""
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        current_user=Depends(get_current_user)
+    ):
+        if request.method != "GET":
+            return
+        used = _with_includes(request, tables, includes)
+        versions = (await db.execute(versions_stmt(used))).all()
+        request.state.table_versions = dict(versions)
+        _check(request, response, _make_etag(request, current_user, used, versions))
+    return dependency
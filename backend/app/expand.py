@@ -0,0 +1,78 @@
+# app/expand.py
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy.orm import joinedload
+
+from backend.app import models, schemes, fastjson
+
+# Вложенные объекты по параметру include=contract,office,tenant.
+# Каждое имя — путь по связям модели; все связи здесь «многие к одному», поэтому
+# связанные строки подтягиваются joinedload в тот же SELECT: число запросов
+# не зависит от размера страницы. Без include ответы остаются прежними.
+OUT_SCHEMAS = {
+    models.Contract: schemes.ContractOut,
+    models.Office: schemes.OfficeOut,
+    models.Tenant: schemes.TenantOut,
+}
+
+REQUEST_INCLUDES = {"contract": ("договор",), "office": ("договор", "офис"), "tenant": ("договор", "арендатор")}
+PAYMENT_INCLUDES = REQUEST_INCLUDES
+BOOKING_INCLUDES = {"office": ("офис",), "tenant": ("арендатор",)}
+CONTRACT_INCLUDES = {"office": ("офис",), "tenant": ("арендатор",)}
+
+
+def include_param(allowed: dict):
+    """Зависимость: разбирает include=... в словарь {имя: путь по связям}."""
+    def dependency(
+        include: Optional[str] = Query(None, description=f"Вложенные объекты через запятую: {', '.join(allowed)}")
+    ):
+        names = [name.strip() for name in include.split(",") if name.strip()] if include else []
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неизвестное значение include: {', '.join(unknown)} (допустимо: {', '.join(allowed)})"
+            )
+        return {name: allowed[name] for name in names}
+    return dependency
+
+
+def include_tables(model, allowed: dict) -> dict:
+    """{имя include: таблицы на его пути} — чтобы ETag учитывал и вложенные объекты."""
+    tables = {}
+    for name, path in allowed.items():
+        owner, names = model, []
+        for attr in path:
+            owner = getattr(owner, attr).property.mapper.class_
+            names.append(owner.__tablename__)
+        tables[name] = tuple(names)
+    return tables
+
+
+def load_options(model, include: dict):
+    """joinedload-цепочки для всех путей include."""
+    options = []
+    for path in include.values():
+        option, owner = None, model
+        for attr in path:
+            relationship = getattr(owner, attr)
+            option = joinedload(relationship) if option is None else option.joinedload(relationship)
+            owner = relationship.property.mapper.class_
+        options.append(option)
+    return options
+
+
+def expand(obj, out_schema, include: dict) -> dict:
+    """Объект по схеме ответа плюс вложенные объекты под именами связей (договор, офис, арендатор)."""
+    item = out_schema.model_validate(obj).model_dump(mode="json")
+    for path in include.values():
+        target = obj
+        for attr in path:
+            target = getattr(target, attr) if target is not None else None
+        item[path[-1]] = OUT_SCHEMAS[type(target)].model_validate(target).model_dump(mode="json") if target is not None else None
+    return item
+
+
+def expanded_response(objects, out_schema, include: dict, response: Response) -> Response:
+    return fastjson.json_response([expand(obj, out_schema, include) for obj in objects], response)
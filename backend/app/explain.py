@@ -0,0 +1,114 @@
+# app/explain.py
+"""
+Проверка по EXPLAIN, что запросы маршрутов используют свои индексы.
+
+    python -m backend.app.explain
+
+Seq scan на время проверки запрещается (enable_seqscan = off): на маленькой
+таблице планировщик честно выберет полный проход, а нам важно, может ли
+запрос вообще пойти по индексу.
+"""
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from backend.app.models import Booking, Contract, OccupancySnapshot, Office, Payment, Request, Tenant
+from backend.app.pagination import DEFAULT_PAGE_SIZE
+from backend.app.routes.tenant import search_condition
+
+
+def _page(stmt, pk_column):
+    # Так же, как paginate(): ORDER BY pk LIMIT n+1
+    return stmt.order_by(pk_column).limit(DEFAULT_PAGE_SIZE + 1)
+
+
+# (маршрут, ожидаемый индекс, запрос в том виде, в каком его строит маршрут)
+ROUTE_QUERIES = [
+    (
+        "POST /payments/check-overdue",
+        "ix_платеж_статус_срок_оплаты",
+        lambda: select(Payment.id_платежа).where(Payment.срок_оплаты < date.today(), Payment.статус == "не оплачен"),
+    ),
+    (
+        "GET /contracts (tenant)",
+        "ix_договор_id_арендатора",
+        lambda: _page(select(Contract).where(Contract.id_арендатора == 1), Contract.id_договора),
+    ),
+    (
+        "GET /bookings (tenant)",
+        "ix_бронь_id_арендатора",
+        lambda: _page(select(Booking).where(Booking.id_арендатора == 1), Booking.id_брони),
+    ),
+    (
+        "GET /offices/availability",
+        "ix_бронь_офис_период",
+        lambda: select(Booking.id_офиса, Booking.начало_брони, Booking.окончание_брони).where(
+            Booking.id_офиса.in_([1, 2, 3]),
+            Booking.начало_брони < date.today(),
+            Booking.окончание_брони > date.today(),
+        ),
+    ),
+    (
+        "GET /requests?contract_id&date_from&status",
+        "ix_заявка_договор_дата_статус",
+        lambda: _page(
+            select(Request).where(
+                Request.id_договора == 1, Request.дата_подачи >= date.today(), Request.статус == "новая"
+            ),
+            Request.id_заявки,
+        ),
+    ),
+    (
+        "GET /offices?status&floor",
+        "ix_офис_статус_этаж",
+        lambda: _page(select(Office).where(Office.статус == "свободен", Office.этаж == 1), Office.id_офиса),
+    ),
+    (
+        "GET /tenants/search",
+        "ix_арендатор_название_trgm",
+        lambda: select(Tenant).where(search_condition("рога")[0]).limit(10),
+    ),
+    (
+        "GET /analytics/occupancy (год)",
+        "заполненность_pkey",
+        lambda: select(OccupancySnapshot.дата, func.sum(OccupancySnapshot.площадь_арендуется)).where(
+            OccupancySnapshot.дата.between(date.today() - timedelta(days=365), date.today())
+        ).group_by(OccupancySnapshot.дата).order_by(OccupancySnapshot.дата),
+    ),
+]
+
+
+def _index_names(plan: dict):
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+def check_index_usage(db: Session) -> list[dict]:
+    results = []
+    try:
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        for route, expected, build in ROUTE_QUERIES:
+            compiled = build().compile(dialect=db.bind.dialect, compile_kwargs={"render_postcompile": True})
+            raw = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            used = sorted(set(_index_names(plan)))
+            results.append({"route": route, "expected_index": expected, "used_indexes": used, "ok": expected in used})
+    finally:
+        db.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    from backend.app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        for row in check_index_usage(db):
+            mark = "OK  " if row["ok"] else "FAIL"
+            print(f"{mark} {row['route']:<45} ожидается {row['expected_index']}, в плане: {', '.join(row['used_indexes']) or '—'}")
+    finally:
+        db.close()
@@ -0,0 +1,58 @@
+# app/export.py
+import csv
+import io
+
+import orjson
+from fastapi import HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+
+# Потоковая выгрузка больших таблиц в CSV / NDJSON.
+# Запрос читается серверным курсором (yield_per) пачками по EXPORT_BATCH_SIZE строк,
+# каждая пачка сразу кодируется и отдаётся клиенту — память не растёт с размером выгрузки.
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_chunks(names, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(names, partitions):
+    for rows in partitions:
+        yield b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+
+def _stream(db, stmt, names, fmt):
+    result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    chunks = _csv_chunks if fmt == "csv" else _ndjson_chunks
+    yield from chunks(names, result.partitions())
+
+
+def export_response(db, stmt, names, fmt: str, filename: str, response: Response) -> StreamingResponse:
+    """
+    StreamingResponse с результатом stmt (select колонок в порядке names).
+    db — сессия запроса из get_db, та же, что у зависимости ETag: FastAPI закрывает её
+    только после отправки тела, поэтому выгрузка занимает одно соединение пула.
+    Заголовок CSV — имена колонок; null в CSV — пустая ячейка.
+    Заголовки, выставленные зависимостями в response (ETag), переносятся в ответ.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Формат выгрузки: csv или ndjson")
+    return StreamingResponse(
+        _stream(db, stmt, names, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={**response.headers, "Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,45 @@
+# app/fastjson.py
+import orjson
+from fastapi import Response
+
+from backend.app.config import settings
+from backend.app.pagination import PageParams, paginate, paginate_async
+
+# Быстрый путь для списков (settings.fast_lists).
+# Вместо ORM-объектов выбираются только колонки схемы ответа, строки сразу
+# кодируются orjson и отдаются готовым Response: без identity map, без построчной
+# валидации response_model и без jsonable_encoder. Поля схем — целые, строки и даты,
+# поэтому тело байт в байт совпадает с обычным ответом FastAPI.
+enabled = settings.fast_lists
+
+
+def columns(model, schema):
+    """Колонки модели в порядке полей схемы ответа."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def json_response(items, response: Response) -> Response:
+    """Готовый JSON-ответ; заголовки (X-Next-Cursor, ETag) переносятся из response."""
+    return Response(content=orjson.dumps(items), media_type="application/json", headers=response.headers)
+
+
+def row_dicts(schema, rows) -> list:
+    names = tuple(schema.model_fields)
+    return [dict(zip(names, row)) for row in rows]
+
+
+def rows_response(schema, rows, response: Response) -> Response:
+    return json_response(row_dicts(schema, rows), response)
+
+
+def paginate_rows(query, schema, pk_column, page: PageParams, response: Response):
+    """paginate() по кортежам колонок схемы вместо ORM-объектов."""
+    model = pk_column.class_
+    return paginate(query.with_entities(*columns(model, schema)), pk_column, page, response)
+
+
+async def paginate_rows_async(db, stmt, schema, pk_column, page: PageParams, response: Response):
+    """paginate_async() по кортежам колонок схемы вместо ORM-объектов."""
+    model = pk_column.class_
+    stmt = stmt.with_only_columns(*columns(model, schema))
+    return await paginate_async(db, stmt, pk_column, page, response, scalars=False)
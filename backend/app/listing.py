@@ -0,0 +1,52 @@
+# app/listing.py
+from fastapi import Response
+
+from backend.app import expand, fastjson
+from backend.app.pagination import PageParams, paginate, paginate_async
+
+# Общая часть GET-эндпоинтов синхронных роутеров и routes/read_async.py.
+# Фильтры в роутерах (filter_contracts и т.п.) пишутся через filter/join/options:
+# эти методы есть и у Query (db.query), и у select(), поэтому один и тот же фильтр
+# строит запрос для обоих стеков. Здесь — выборка страницы под нужную выдачу и сама выдача.
+
+
+def fetch_page(query, schema, pk_column, include: dict, page: PageParams, response: Response):
+    """Страница списка: ORM-объекты со связями include, кортежи колонок схемы (fast_lists) или ORM-объекты."""
+    if include:
+        return paginate(query.options(*expand.load_options(pk_column.class_, include)), pk_column, page, response)
+    if fastjson.enabled:
+        return fastjson.paginate_rows(query, schema, pk_column, page, response)
+    return paginate(query, pk_column, page, response)
+
+
+async def fetch_page_async(db, stmt, schema, pk_column, include: dict, page: PageParams, response: Response):
+    """То же, что fetch_page, для select() и AsyncSession."""
+    if include:
+        stmt = stmt.options(*expand.load_options(pk_column.class_, include))
+        return await paginate_async(db, stmt, pk_column, page, response)
+    if fastjson.enabled:
+        return await fastjson.paginate_rows_async(db, stmt, schema, pk_column, page, response)
+    return await paginate_async(db, stmt, pk_column, page, response)
+
+
+def page_response(rows, schema, include: dict, response: Response):
+    """Выдача страницы из fetch_page / fetch_page_async."""
+    if include:
+        return expand.expanded_response(rows, schema, include, response)
+    if fastjson.enabled:
+        return fastjson.rows_response(schema, rows, response)
+    return rows
+
+
+def page_dicts(rows, schema) -> list:
+    """Страница из fetch_page без include списком словарей (для кэша)."""
+    if fastjson.enabled:
+        return fastjson.row_dicts(schema, rows)
+    return [schema.model_validate(obj).model_dump(mode="json") for obj in rows]
+
+
+def item_response(obj, schema, include: dict, response: Response):
+    """Выдача одного объекта, уже загруженного со связями include."""
+    if include:
+        return fastjson.json_response(expand.expand(obj, schema, include), response)
+    return obj
@@ -1,12 +1,34 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from backend.app.database import Base, engine
-from backend.app import models
-from backend.app.routes import tenant, office, contract, payment, booking, request, register, auth
+from backend.app import models, utils, reports, querystats, metrics, profiler, etag
+from backend.app.pagination import NEXT_CURSOR_HEADER
+from backend.app.etag import ETAG_HEADER
+from backend.app.routes import tenant, office, contract, payment, booking, request, register, auth, read_async, admin, me, report, analytics
+from backend.app.routes import metrics as metrics_route
+from backend.app.config import settings
 from fastapi.middleware.cors import CORSMiddleware
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    utils.start_hash_pool()
+    refresher = asyncio.create_task(reports.refresh_loop()) if settings.reports_refresh_seconds > 0 else None
+    metrics_flusher = asyncio.create_task(metrics.flush_loop()) if settings.metrics_dir else None
+    compactor = asyncio.create_task(etag.compact_loop()) if settings.table_versions_compact_seconds > 0 else None
+    yield
+    for task in (refresher, metrics_flusher, compactor):
+        if task:
+            task.cancel()
+    utils.shutdown_hash_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 origins = ["*"]
 
 app.add_middleware(
@@ -15,9 +37,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, querystats.SERVER_TIMING_HEADER],
 )
 
 
+# Профилирование по команде /admin/profiler; без активной сессии — одна проверка на запрос.
+# Стоит внутри query_stats: call_next запускает остальную цепочку отдельной задачей, и
+# профайлер должен запомнить именно ту задачу, в которой выполняется обработчик
+app.add_middleware(profiler.ProfilerMiddleware)
+
+
+# Число SQL-запросов и время в БД на каждый запрос: Server-Timing, лог, бюджет маршрута
+@app.middleware("http")
+async def query_stats(request: Request, call_next):
+    return await querystats.track(request, call_next)
+
+
+# Метрики Prometheus — самый внешний слой, чтобы время включало остальные middleware
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+# Оптимистичная блокировка (models.Office/Contract.версия): строку изменили между
+# чтением и записью. Сессия откатывается в get_db, клиент перечитывает и повторяет
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Данные изменены другим пользователем, повторите операцию"},
+    )
+
+
+# Асинхронные GET-эндпоинты регистрируются первыми и перекрывают синхронные
+if settings.async_routes:
+    app.include_router(read_async.router)
 
 app.include_router(tenant.router)
 app.include_router(office.router)
@@ -27,6 +79,11 @@ app.include_router(booking.router)
 app.include_router(request.router)
 app.include_router(register.router)
 app.include_router(auth.router)
+app.include_router(me.router)
+app.include_router(report.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
+app.include_router(metrics_route.router)
 
 
 
@@ -0,0 +1,212 @@
+# app/metrics.py
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+
+from backend.app.config import settings
+from backend.app.database import engine, async_engine
+from backend.app.oauth2 import token_cache
+from backend.app.pool import pool_status
+
+# Метрики в текстовом формате Prometheus (GET /metrics).
+# Счётчики запросов меняет только MetricsMiddleware в потоке event loop, поэтому
+# блокировки не нужны; пулы соединений и кэш токенов опрашиваются только при сборе.
+# Несколько воркеров (uvicorn --workers): если задан settings.metrics_dir, каждый раз
+# в settings.metrics_flush_seconds пишет свой снимок в <metrics_dir>/<pid>.json, а /metrics
+# суммирует файлы всех воркеров. Счётчики умерших воркеров остаются в сумме, их gauge — нет;
+# каталог стоит очищать при перезапуске сервиса.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Время обработки запроса по префиксу роутера и методу"),
+    "http_requests_in_flight": ("gauge", "Запросы в обработке"),
+    "http_responses_total": ("counter", "Ответы по коду статуса"),
+    "db_pool_size": ("gauge", "Постоянный размер пула соединений"),
+    "db_pool_connections": ("gauge", "Соединения пула по состоянию"),
+    "db_pool_checkouts_total": ("counter", "Выдачи соединений из пула"),
+    "db_pool_timeouts_total": ("counter", "Таймауты ожидания соединения из пула"),
+    "auth_token_verifications_total": ("counter", "Проверки токенов: из кэша, с jwt.decode, отклонённые"),
+    "auth_token_cache_entries": ("gauge", "Токенов в кэше проверенных"),
+}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.in_flight = 0
+        # (префикс, метод) -> [счётчики по корзинам LATENCY_BUCKETS и +Inf, сумма секунд]
+        self.latency = {}
+        self.responses = {}
+
+    def observe(self, prefix: str, method: str, seconds: float, status_code: int):
+        series = self.latency.get((prefix, method))
+        if series is None:
+            series = self.latency[(prefix, method)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        series[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series[-1] += seconds
+        self.responses[status_code] = self.responses.get(status_code, 0) + 1
+
+
+request_metrics = RequestMetrics()
+
+
+def route_prefix(scope) -> str:
+    """Префикс роутера по шаблону маршрута: /offices/{office_id} -> /offices."""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return "/" + route.path.strip("/").split("/", 1)[0]
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: время до конца отправки тела, код ответа, запросы в обработке."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight -= 1
+            request_metrics.observe(route_prefix(scope), scope["method"], time.perf_counter() - started, status_code)
+
+
+def snapshot() -> list:
+    """Метрики текущего процесса списком [имя, метки, значение]; гистограммы уже накопительные."""
+    samples = []
+    for (prefix, method), series in request_metrics.latency.items():
+        labels = {"prefix": prefix, "method": method}
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), series[:-1]):
+            cumulative += count
+            samples.append(["http_request_duration_seconds_bucket", {**labels, "le": str(bound)}, cumulative])
+        samples.append(["http_request_duration_seconds_sum", labels, series[-1]])
+        samples.append(["http_request_duration_seconds_count", labels, cumulative])
+    samples.append(["http_requests_in_flight", {}, request_metrics.in_flight])
+    for code, count in request_metrics.responses.items():
+        samples.append(["http_responses_total", {"code": str(code)}, count])
+
+    for name, db_engine in (("sync", engine), ("async", async_engine.sync_engine)):
+        status = pool_status(db_engine)
+        if "size" in status:
+            samples.append(["db_pool_size", {"engine": name}, status["size"]])
+            for state in ("checked_out", "idle", "overflow"):
+                samples.append(["db_pool_connections", {"engine": name, "state": state}, status[state]])
+        if "checkouts" in status:
+            samples.append(["db_pool_checkouts_total", {"engine": name}, status["checkouts"]])
+            samples.append(["db_pool_timeouts_total", {"engine": name}, status["timeouts"]])
+
+    tokens = token_cache.stats()
+    samples.append(["auth_token_verifications_total", {"result": "cache_hit"}, tokens["hits"]])
+    samples.append(["auth_token_verifications_total", {"result": "decoded"}, tokens["misses"] - tokens["rejected"]])
+    samples.append(["auth_token_verifications_total", {"result": "rejected"}, tokens["rejected"]])
+    samples.append(["auth_token_cache_entries", {}, tokens["size"]])
+    return samples
+
+
+def _metric_name(sample_name: str) -> str:
+    for suffix in ("_bucket", "_sum", "_count"):
+        if sample_name.endswith(suffix) and sample_name[: -len(suffix)] in METRICS:
+            return sample_name[: -len(suffix)]
+    return sample_name
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _worker_snapshots():
+    """Снимки остальных воркеров из settings.metrics_dir: [(жив ли процесс, samples)]."""
+    if not settings.metrics_dir:
+        return []
+    snapshots = []
+    for filename in os.listdir(settings.metrics_dir):
+        pid = filename.removesuffix(".json")
+        if not filename.endswith(".json") or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            with open(os.path.join(settings.metrics_dir, filename)) as f:
+                snapshots.append((_pid_alive(int(pid)), json.load(f)))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def collect() -> dict:
+    """Сумма по всем воркерам: счётчики и гистограммы — по всем файлам, gauge — только живых процессов."""
+    totals = {}
+    for alive, samples in [(True, snapshot()), *_worker_snapshots()]:
+        for name, labels, value in samples:
+            if not alive and METRICS[_metric_name(name)][0] == "gauge":
+                continue
+            key = (name, tuple(sorted(labels.items())))
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+def render() -> str:
+    by_metric = {}
+    for (name, labels), value in collect().items():
+        by_metric.setdefault(_metric_name(name), []).append((name, labels, value))
+
+    lines = []
+    for metric, (kind, description) in METRICS.items():
+        if metric not in by_metric:
+            continue
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, labels, value in by_metric[metric]:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot():
+    path = os.path.join(settings.metrics_dir, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(path + ".tmp", path)
+
+
+async def flush_loop():
+    """Периодически сохраняет снимок воркера для сборки по процессам (запускается в lifespan)."""
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    try:
+        while True:
+            write_snapshot()
+            await asyncio.sleep(settings.metrics_flush_seconds)
+    finally:
+        write_snapshot()
@@ -1,8 +1,14 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, text, func, CheckConstraint, Date
+from sqlalchemy import Column, ForeignKey, Integer, BigInteger, String, text, func, CheckConstraint, Date, DateTime, DDL, event, Index, Sequence
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from .database import Base
 from sqlalchemy.orm import relationship
 import datetime
 
+# Дополнительная DDL (расширения, триггеры, представления) привязана к событиям отдельных
+# таблиц: create_all выполняет её, только когда действительно создаёт таблицу (пустая база).
+# В существующей базе схему ведут миграции, и старт воркера ничего не пересоздаёт.
+
+
 class Tenant(Base):
     __tablename__ = "арендатор"
 
@@ -12,6 +18,19 @@ class Tenant(Base):
     телефон = Column(String(20), nullable=False, unique=True)
     дата_регистрации = Column(Date, nullable=False, server_default=func.current_date())
 
+    __table_args__ = (
+        Index("ix_арендатор_название_trgm", "название_компании",
+              postgresql_using="gin", postgresql_ops={"название_компании": "gin_trgm_ops"}),
+        Index("ix_арендатор_контакт_trgm", "контактное_лицо",
+              postgresql_using="gin", postgresql_ops={"контактное_лицо": "gin_trgm_ops"}),
+        Index("ix_арендатор_телефон_trgm", "телефон",
+              postgresql_using="gin", postgresql_ops={"телефон": "gin_trgm_ops"}),
+    )
+
+
+# Для триграммного поиска арендаторов (см. миграцию 40f173b030a6)
+event.listen(Tenant.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 
 class Office(Base):
     __tablename__ = "офис"
@@ -22,13 +41,17 @@ class Office(Base):
     площадь = Column(Integer, nullable=False)
     стоимость = Column(Integer, nullable=False)
     статус = Column(String(20), nullable=False)
+    # Версия строки для оптимистичной блокировки: UPDATE/DELETE идут с условием на версию
+    версия = Column(Integer, nullable=False, server_default=text("1"))
 
     __table_args__ = (
         CheckConstraint("этаж >= 1", name="check_этаж"),
         CheckConstraint("площадь > 0", name="check_площадь"),
         CheckConstraint("стоимость > 0", name="check_стоимость"),
         CheckConstraint("статус IN ('свободен', 'арендуется', 'в резерве', 'на обслуживании')", name="check_статус_офиса"),
+        Index("ix_офис_статус_этаж", "статус", "этаж"),
     )
+    __mapper_args__ = {"version_id_col": версия}
 
 class Contract(Base):
     __tablename__ = "договор"
@@ -41,12 +64,15 @@ class Contract(Base):
     стоимость = Column(Integer, nullable=False)
     дата_заключения = Column(Date, nullable=False, server_default=func.current_date())
     статус = Column(String(20), nullable=False)
+    версия = Column(Integer, nullable=False, server_default=text("1"))
 
     __table_args__ = (
         CheckConstraint("стоимость > 0", name="check_стоимость_договора"),
         CheckConstraint("дата_окончания >= дата_начала", name="check_даты_договора"),
         CheckConstraint("статус IN ('активен', 'завершён', 'расторгнут')", name="check_статус_договора"),
+        Index("ix_договор_id_арендатора", "id_арендатора"),
     )
+    __mapper_args__ = {"version_id_col": версия}
 
     # связи
     арендатор = relationship("Tenant", backref="договора")
@@ -68,6 +94,8 @@ class Payment(Base):
     __table_args__ = (
         CheckConstraint("сумма > 0", name="check_сумма_платежа"),
         CheckConstraint("статус IN ('не оплачен', 'оплачен', 'просрочен')", name="check_статус_платежа"),
+        Index("ix_платеж_статус_срок_оплаты", "статус", "срок_оплаты"),
+        Index("ix_платеж_договор_срок", "id_договора", "срок_оплаты"),
     )
 
     договор = relationship("Contract", backref="платежи")
@@ -84,6 +112,7 @@ class Request(Base):
 
     __table_args__ = (
         CheckConstraint("статус IN ('новая', 'в работе', 'выполнена', 'отклонена')", name="check_статус_заявки"),
+        Index("ix_заявка_договор_дата_статус", "id_договора", "дата_подачи", "статус"),
     )
 
     договор = relationship("Contract", backref="заявки")\
@@ -103,12 +132,25 @@ class Booking(Base):
     __table_args__ = (
         CheckConstraint("окончание_брони >= начало_брони", name="check_даты_брони"),
         CheckConstraint("статус IN ('активна', 'аннулирована', 'истекла')", name="check_статус_брони"),
+        Index("ix_бронь_id_арендатора", "id_арендатора"),
+        Index("ix_бронь_офис_период", "id_офиса", "начало_брони", "окончание_брони"),
+        # Брони одного офиса не пересекаются; проверяет сама БД через GiST-индекс
+        ExcludeConstraint(
+            (id_офиса, "="),
+            (func.daterange(начало_брони, окончание_брони, text("'[)'")), "&&"),
+            name="бронь_без_пересечений",
+            using="gist",
+        ),
     )
 
     арендатор = relationship("Tenant", backref="брони")
     офис = relationship("Office", backref="брони")
 
 
+# Для ExcludeConstraint в таблице броней (см. миграцию 75ddcdcb7f53)
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+
 class User(Base):
     __tablename__ = "пользователь"
 
@@ -123,3 +165,129 @@ class User(Base):
     __table_args__ = (
         CheckConstraint("role IN ('admin','tenant','staff')"),
     )
+
+
+# --------------------------
+# Версии таблиц для ETag (см. миграции f75cd2eaa8ad, b6e4d2f8a915)
+# --------------------------
+# Триггер на каждую изменяющую инструкцию увеличивает счётчик таблицы в той же транзакции,
+# поэтому новая версия становится видна вместе с данными.
+# Счётчик разбит на слоты, версия таблицы — их сумма: триггер берёт первый слот, не занятый
+# другой транзакцией (FOR UPDATE SKIP LOCKED), а если заняты все — добавляет новую строку
+# с номером из последовательности. Ни одна ветка не ждёт чужих блокировок, поэтому
+# параллельные записи в таблицу не выстраиваются в очередь на счётчике. Слоты, добавленные
+# в пиках нагрузки, периодически сворачивает etag.compact_table_versions.
+VERSIONED_TABLES = ("арендатор", "офис", "договор", "платеж", "заявка", "бронь")
+
+TABLE_VERSION_SLOT_SEQ = Sequence("версия_таблицы_слот_seq", metadata=Base.metadata)
+
+
+class TableVersion(Base):
+    __tablename__ = "версия_таблицы"
+
+    таблица = Column(String(63), primary_key=True)
+    слот = Column(BigInteger, primary_key=True, server_default=TABLE_VERSION_SLOT_SEQ.next_value())
+    версия = Column(BigInteger, nullable=False, server_default=text("0"))
+
+
+TABLE_VERSION_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION увеличить_версию_таблицы() RETURNS trigger AS $$
+BEGIN
+    UPDATE версия_таблицы SET версия = версия + 1
+    WHERE (таблица, слот) = (
+        SELECT таблица, слот FROM версия_таблицы
+        WHERE таблица = TG_TABLE_NAME
+        ORDER BY слот LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    );
+    IF NOT FOUND THEN
+        INSERT INTO версия_таблицы (таблица, версия) VALUES (TG_TABLE_NAME, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Функция создаётся вместе с каждой таблицей: порядок создания таблиц create_all не гарантирует
+for _table in VERSIONED_TABLES:
+    event.listen(Base.metadata.tables[_table], "after_create", DDL(TABLE_VERSION_FUNCTION_SQL))
+    event.listen(Base.metadata.tables[_table], "after_create", DDL(
+        f"CREATE OR REPLACE TRIGGER версия_{_table} "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_table} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION увеличить_версию_таблицы()"
+    ))
+
+
+# --------------------------
+# Снимки заполненности по этажам (см. миграцию 5c81d4e2f9a0)
+# --------------------------
+class OccupancySnapshot(Base):
+    __tablename__ = "заполненность"
+
+    # Первичный ключ (дата, этаж): выборка за любой период — один проход по индексу
+    дата = Column(Date, primary_key=True)
+    этаж = Column(Integer, primary_key=True)
+    офисов = Column(Integer, nullable=False)
+    площадь_всего = Column(Integer, nullable=False)
+    площадь_арендуется = Column(Integer, nullable=False)
+    площадь_в_резерве = Column(Integer, nullable=False)
+    площадь_на_обслуживании = Column(Integer, nullable=False)
+
+
+# --------------------------
+# Финансовые отчёты (см. миграцию 9b3e51c0a7d2)
+# --------------------------
+# Материализованные представления обновляются reports.refresh_reports():
+# по расписанию и только если с прошлого раза изменились платежи, договоры,
+# офисы или наступил новый день (от него зависят корзины просрочки).
+REVENUE_VIEW_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS отчет_выручка AS
+SELECT date_trunc('month', coalesce(п.дата_платежа, п.срок_оплаты))::date AS месяц,
+       о.этаж,
+       д.id_арендатора,
+       sum(п.сумма)::bigint AS сумма,
+       count(*) AS количество
+FROM платеж п
+JOIN договор д ON д.id_договора = п.id_договора
+JOIN офис о ON о.id_офиса = д.id_офиса
+WHERE п.статус = 'оплачен'
+GROUP BY 1, 2, 3
+"""
+
+ARREARS_VIEW_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS отчет_задолженность AS
+SELECT о.этаж,
+       д.id_арендатора,
+       coalesce(sum(п.сумма) FILTER (WHERE п.срок_оплаты >= current_date), 0)::bigint AS не_наступил,
+       coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 1 AND 30), 0)::bigint AS до_30,
+       coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 31 AND 60), 0)::bigint AS от_31_до_60,
+       coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты BETWEEN 61 AND 90), 0)::bigint AS от_61_до_90,
+       coalesce(sum(п.сумма) FILTER (WHERE current_date - п.срок_оплаты > 90), 0)::bigint AS свыше_90,
+       sum(п.сумма)::bigint AS итого,
+       count(*) AS количество
+FROM платеж п
+JOIN договор д ON д.id_договора = п.id_договора
+JOIN офис о ON о.id_офиса = д.id_офиса
+WHERE п.статус IN ('не оплачен', 'просрочен')
+GROUP BY 1, 2
+"""
+
+
+class ReportState(Base):
+    __tablename__ = "отчет_состояние"
+
+    отчет = Column(String(50), primary_key=True)
+    метка = Column(String(200), nullable=False)  # версии исходных таблиц и дата на момент обновления
+    обновлено_в = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Представления создаются вместе с таблицей платежей: договоры и офисы (внешние ключи) к этому моменту уже есть
+event.listen(Payment.__table__, "after_create", DDL(REVENUE_VIEW_SQL))
+event.listen(Payment.__table__, "after_create", DDL(ARREARS_VIEW_SQL))
+# Уникальные индексы нужны для REFRESH MATERIALIZED VIEW CONCURRENTLY
+event.listen(Payment.__table__, "after_create", DDL(
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_отчет_выручка ON отчет_выручка (месяц, этаж, id_арендатора)"
+))
+event.listen(Payment.__table__, "after_create", DDL(
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_отчет_задолженность ON отчет_задолженность (этаж, id_арендатора)"
+))
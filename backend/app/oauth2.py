@@ -1,3 +1,7 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi import Depends, status, HTTPException
@@ -12,6 +16,54 @@ ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
 
+class TokenCache:
+    """
+    LRU-кэш уже проверенных токенов: sha256(токен) -> TokenData до момента exp.
+    Повторные запросы с тем же токеном не делают jwt.decode и проверку подписи.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # промахи, на которых токен не прошёл проверку
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, token_data, expires_at: float):
+        with self._lock:
+            self._entries[key] = (token_data, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "rejected": self.rejected,
+            }
+
+
+token_cache = TokenCache(settings.token_cache_size)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -20,6 +72,11 @@ def create_access_token(data: dict):
 
 
 def verify_access_token(token: str, credentials_exception):
+    cache_key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(cache_key)
+    if token_data is not None:
+        return token_data
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("user_id")
@@ -27,12 +84,20 @@ def verify_access_token(token: str, credentials_exception):
         role = payload.get("user_role")
 
         if user_id is None or role is None:
+            token_cache.reject()
             raise credentials_exception
 
-        return schemes.TokenData(id=int(user_id), role=role, tenant_id=tenant_id)
+        token_data = schemes.TokenData(id=int(user_id), role=role, tenant_id=tenant_id)
     except JWTError:
+        token_cache.reject()
         raise credentials_exception
 
+    # Кэшируем только до истечения токена; токены без exp не кэшируем
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        token_cache.put(cache_key, token_data, float(expires_at))
+    return token_data
+
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
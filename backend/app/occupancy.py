@@ -0,0 +1,84 @@
+# app/occupancy.py
+"""
+Ежедневные снимки заполненности по этажам (таблица заполненность).
+
+    python -m backend.app.occupancy                         # снимок за сегодня (для cron)
+    python -m backend.app.occupancy 2026-01-01 2026-10-16   # досчитать период
+
+Состояние офиса на дату: арендуется (действующий договор на эту дату),
+на обслуживании, в резерве (бронь на эту дату) или свободен — в таком порядке.
+Office.статус хранит только текущее состояние, поэтому учитывается лишь
+в снимке за сегодня; прошлые даты восстанавливаются по договорам и броням.
+"""
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SNAPSHOT_SQL = text("""
+WITH состояние AS (
+    SELECT о.этаж, о.площадь,
+        CASE
+            WHEN EXISTS (
+                SELECT 1 FROM договор д
+                WHERE д.id_офиса = о.id_офиса AND д.статус <> 'расторгнут'
+                  AND д.дата_начала <= :day AND д.дата_окончания >= :day
+            ) OR (:is_today AND о.статус = 'арендуется') THEN 'арендуется'
+            WHEN :is_today AND о.статус = 'на обслуживании' THEN 'на обслуживании'
+            WHEN EXISTS (
+                SELECT 1 FROM бронь б
+                WHERE б.id_офиса = о.id_офиса AND б.статус <> 'аннулирована'
+                  AND б.начало_брони <= :day AND б.окончание_брони > :day
+            ) OR (:is_today AND о.статус = 'в резерве') THEN 'в резерве'
+            ELSE 'свободен'
+        END AS статус
+    FROM офис о
+)
+INSERT INTO заполненность (
+    дата, этаж, офисов, площадь_всего, площадь_арендуется, площадь_в_резерве, площадь_на_обслуживании
+)
+SELECT :day, этаж, count(*), sum(площадь),
+       coalesce(sum(площадь) FILTER (WHERE статус = 'арендуется'), 0),
+       coalesce(sum(площадь) FILTER (WHERE статус = 'в резерве'), 0),
+       coalesce(sum(площадь) FILTER (WHERE статус = 'на обслуживании'), 0)
+FROM состояние
+GROUP BY этаж
+ON CONFLICT (дата, этаж) DO UPDATE SET
+    офисов = EXCLUDED.офисов,
+    площадь_всего = EXCLUDED.площадь_всего,
+    площадь_арендуется = EXCLUDED.площадь_арендуется,
+    площадь_в_резерве = EXCLUDED.площадь_в_резерве,
+    площадь_на_обслуживании = EXCLUDED.площадь_на_обслуживании
+""")
+
+
+def take_snapshot(db: Session, day: date = None) -> int:
+    """Снимок за день одним INSERT ... SELECT; повторный запуск перезаписывает его. Возвращает число этажей."""
+    day = day or date.today()
+    result = db.execute(SNAPSHOT_SQL, {"day": day, "is_today": day == date.today()})
+    db.commit()
+    return result.rowcount
+
+
+def take_snapshots(db: Session, date_from: date, date_to: date) -> int:
+    """Досчитывает снимки за период [date_from, date_to]."""
+    day, floors = date_from, 0
+    while day <= date_to:
+        floors += take_snapshot(db, day)
+        day += timedelta(days=1)
+    return floors
+
+
+if __name__ == "__main__":
+    from backend.app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if len(sys.argv) == 3:
+            start, end = date.fromisoformat(sys.argv[1]), date.fromisoformat(sys.argv[2])
+            print(f"Снимков этажей записано: {take_snapshots(db, start, end)}")
+        else:
+            print(f"Снимков этажей записано: {take_snapshot(db)}")
+    finally:
+        db.close()
@@ -0,0 +1,75 @@
+# app/pagination.py
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response, status
+
+from backend.app.config import settings
+
+DEFAULT_PAGE_SIZE = settings.page_size_default
+MAX_PAGE_SIZE = settings.page_size_max
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError
+        return last_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор пагинации"
+        )
+
+
+class PageParams:
+    """Параметры keyset-пагинации: размер страницы и курсор после последнего элемента."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+        after: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+    ):
+        self.limit = limit
+        self.after = decode_cursor(after) if after else None
+
+
+def paginate(query, pk_column, page: PageParams, response: Response):
+    """
+    Возвращает одну страницу запроса, упорядоченного по первичному ключу.
+    Если есть следующая страница, курсор на неё кладётся в заголовок X-Next-Cursor,
+    тело ответа остаётся обычным списком.
+    """
+    if page.after is not None:
+        query = query.filter(pk_column > page.after)
+
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows = query.order_by(pk_column).limit(page.limit + 1).all()
+    return _trim_page(rows, pk_column, page, response)
+
+
+async def paginate_async(db, stmt, pk_column, page: PageParams, response: Response, scalars: bool = True):
+    """То же, что paginate, но для select() и AsyncSession. scalars=False — вернуть строки, а не объекты."""
+    if page.after is not None:
+        stmt = stmt.where(pk_column > page.after)
+
+    result = await db.execute(stmt.order_by(pk_column).limit(page.limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    return _trim_page(rows, pk_column, page, response)
+
+
+def _trim_page(rows, pk_column, page: PageParams, response: Response):
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], pk_column.key))
+    return rows
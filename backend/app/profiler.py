@@ -0,0 +1,298 @@
+# app/profiler.py
+import asyncio
+import fnmatch
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+import fastapi.concurrency
+import fastapi.dependencies.utils
+import fastapi.routing
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Сэмплирующий профайлер живых запросов (запускается через /admin/profiler).
+# Пока сессия не запущена, ProfilerMiddleware только проверяет одну глобальную переменную.
+# Отобранный запрос помечается явно: middleware кладёт его в ContextVar, а обёртка над
+# run_in_threadpool (ставится только на время сессии) отмечает поток пула, пока тот выполняет
+# синхронный обработчик или зависимость этого запроса. Отдельный поток раз в interval_ms
+# снимает sys._current_frames() и засчитывает только отмеченные потоки, а поток event loop —
+# когда в нём выполняется задача профилируемого запроса. Так в профиль попадает и ожидание
+# БД, но не чужие запросы, даже к тому же маршруту. Результат — свёрнутые стеки
+# (flamegraph.pl, speedscope) в settings.profiles_dir; файлы пишет поток профайлера, а не
+# event loop. Сессия действует в том воркере, который получил команду.
+PROFILE_ID_LENGTH = 64
+
+
+class ProfiledRequest:
+    """Запрос, отобранный в сессию: его задача в event loop и потоки пула, занятые им сейчас."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.task = asyncio.current_task()
+        self.threads = set()
+
+    def label(self) -> Optional[str]:
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path}" if route else None
+
+    def run(self, func, *args, **kwargs):
+        """Выполняется в потоке пула вместо func."""
+        thread_id = threading.get_ident()
+        self.threads.add(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.threads.discard(thread_id)
+
+
+_request: ContextVar[Optional[ProfiledRequest]] = ContextVar("profiled_request", default=None)
+
+
+async def _run_in_threadpool(func, *args, **kwargs):
+    # run_in_threadpool копирует контекст, но из потока профайлера контекст чужого потока
+    # не виден — поэтому поток отмечается сам, выполняя func через ProfiledRequest.run
+    request = _request.get()
+    if request is not None:
+        func = functools.partial(request.run, func)
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+# Через эти модули FastAPI вызывает синхронные обработчики, зависимости и их __enter__.
+# Обёртка ставится только на время сессии; без сессии FastAPI вызывает пул напрямую
+_THREADPOOL_MODULES = (fastapi.routing, fastapi.dependencies.utils, fastapi.concurrency)
+
+
+def _set_threadpool_hook(installed: bool):
+    for module in _THREADPOOL_MODULES:
+        if getattr(module, "run_in_threadpool", None) not in (run_in_threadpool, _run_in_threadpool):
+            if installed:
+                logger.warning(
+                    "%s.run_in_threadpool не найден: синхронный код в пуле потоков не попадёт в профиль",
+                    module.__name__,
+                )
+            continue
+        module.run_in_threadpool = _run_in_threadpool if installed else run_in_threadpool
+
+
+class ProfileSession:
+    def __init__(self, pattern: str, requests: int, sample_rate: float, interval_ms: int):
+        self.id = f"{int(time.time() * 1000)}-{os.getpid()}"
+        self.pattern = pattern
+        self.requests = requests
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.started_at = time.time()
+        self.remaining = requests
+        self.stacks = Counter()
+        self.samples = 0
+        self.done = False
+        self._active = set()  # ProfiledRequest в обработке
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def wants(self, scope) -> bool:
+        if self.remaining <= 0 or not fnmatch.fnmatchcase(scope["path"], self.pattern):
+            return False
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return False
+        self.remaining -= 1
+        return True
+
+    def begin(self, request: ProfiledRequest):
+        with self._lock:
+            self._active.add(request)
+
+    def end(self, request: ProfiledRequest):
+        # Вызывается в event loop: только помечает сессию завершённой, файлы пишет run()
+        with self._lock:
+            self._active.discard(request)
+            finished = self.remaining <= 0 and not self._active
+        if finished:
+            self.close()
+
+    def _targets(self) -> dict:
+        """id потока -> метка запроса, код которого этот поток выполняет сейчас."""
+        with self._lock:
+            requests = list(self._active)
+        targets = {}
+        for request in requests:
+            label = request.label()
+            if label is None:
+                continue
+            for thread_id in list(request.threads):
+                targets[thread_id] = label
+            # Задача в event loop выполняется, только пока обработчик не отдал управление
+            if request.task is not None and asyncio.current_task(request.loop) is request.task:
+                targets[request.loop_thread] = label
+        return targets
+
+    def sample(self):
+        targets = self._targets()
+        if not targets:
+            return
+        for thread_id, frame in sys._current_frames().items():
+            label = targets.get(thread_id)
+            if label is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            names = ";".join(
+                f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                for code in reversed(stack)
+            )
+            self.stacks[f"{label};{names}"] += 1
+            self.samples += 1
+
+    def run(self):
+        while not self.done:
+            time.sleep(self.interval)
+            if not self.done:
+                self.sample()
+        self._save()
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "pattern": self.pattern,
+            "requests": self.requests,
+            "profiled": self.requests - self.remaining,
+            "sample_rate": self.sample_rate,
+            "interval_ms": round(self.interval * 1000),
+            "samples": self.samples,
+            "started_at": self.started_at,
+        }
+
+    def close(self):
+        """Останавливает сэмплирование; результат сохранит поток профайлера."""
+        global _session
+        with self._lock:
+            if self.done:
+                return
+            self.done = True
+        if _session is self:
+            _session = None
+            _set_threadpool_hook(False)
+
+    def finish(self):
+        """Останавливает сессию и ждёт, пока результат будет сохранён (не из event loop)."""
+        self.close()
+        self._thread.join()
+
+    def _save(self):
+        os.makedirs(settings.profiles_dir, exist_ok=True)
+        path = os.path.join(settings.profiles_dir, self.id)
+        with open(path + ".txt", "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+        with open(path + ".json", "w") as f:
+            json.dump({**self.info(), "finished_at": time.time()}, f)
+
+
+_session = None
+
+
+def start(pattern: str, requests: int, sample_rate: float, interval_ms: int) -> ProfileSession:
+    global _session
+    if _session is not None:
+        _session.finish()
+    session = ProfileSession(pattern, requests, sample_rate, interval_ms)
+    _set_threadpool_hook(True)
+    session._thread.start()
+    _session = session
+    return session
+
+
+def stop():
+    """Завершает текущую сессию досрочно и сохраняет то, что успели собрать."""
+    session = _session
+    if session is not None:
+        session.finish()
+    return session
+
+
+def current():
+    return _session
+
+
+def saved_profiles() -> list:
+    if not os.path.isdir(settings.profiles_dir):
+        return []
+    profiles = []
+    for filename in sorted(os.listdir(settings.profiles_dir), reverse=True):
+        if filename.endswith(".json"):
+            with open(os.path.join(settings.profiles_dir, filename)) as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def profile_path(profile_id: str):
+    """Путь к свёрнутым стекам профиля или None; id проверяется, чтобы не выйти из каталога."""
+    head, _, tail = profile_id.partition("-")
+    if len(profile_id) > PROFILE_ID_LENGTH or not (head.isdigit() and tail.isdigit()):
+        return None
+    path = os.path.join(settings.profiles_dir, f"{profile_id}.txt")
+    return path if os.path.exists(path) else None
+
+
+def to_speedscope(collapsed: str, name: str, interval_ms: float) -> dict:
+    """Свёрнутые стеки -> формат speedscope (https://www.speedscope.app), вес сэмпла в миллисекундах."""
+    frames, index, samples, weights = [], {}, [], []
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        sample = []
+        for frame in stack.split(";"):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame})
+            sample.append(index[frame])
+        samples.append(sample)
+        weights.append(int(count) * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+class ProfilerMiddleware:
+    """ASGI-middleware: отбирает запросы в текущую сессию профилирования."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        session = _session
+        if session is None or scope["type"] != "http" or not session.wants(scope):
+            return await self.app(scope, receive, send)
+
+        request = ProfiledRequest(scope)
+        session.begin(request)
+        token = _request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
+            session.end(request)
@@ -0,0 +1,92 @@
+# app/querystats.py
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+
+from backend.app.config import settings
+from backend.app.database import engine, async_engine
+
+logger = logging.getLogger(__name__)
+
+# Сколько SQL-запросов и сколько времени в БД ушло на HTTP-запрос.
+# Счётчики копятся через события движков, текущий запрос находится по ContextVar:
+# run_in_threadpool копирует контекст, поэтому синхронные обработчики пишут в тот же объект.
+# Выдача: заголовок Server-Timing, строка лога и проверка бюджета запросов на маршрут.
+# Запросы, которые идут уже после отправки заголовков (тело StreamingResponse), не учитываются.
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Маршрут выполнил больше запросов, чем разрешено (settings.query_budget_strict)."""
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - context._query_started
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_key(request: Request) -> str:
+    """«МЕТОД /шаблон/{маршрута}» — ключ бюджета и строки лога."""
+    route = request.scope.get("route")
+    return f"{request.method} {route.path if route else 'unmatched'}"
+
+
+def budget_for(key: str) -> int:
+    return settings.query_budgets.get(key, settings.query_budget_default)
+
+
+async def track(request: Request, call_next):
+    """Тело middleware в main.py: считает запросы к БД на время обработки."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total = time.perf_counter() - started
+
+    key = route_key(request)
+    response.headers[SERVER_TIMING_HEADER] = (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", total;dur={total * 1000:.2f}'
+    )
+    logger.info(
+        "route=%r status=%d queries=%d db_ms=%.2f total_ms=%.2f",
+        key, response.status_code, stats.queries, stats.db_time * 1000, total * 1000,
+        extra={"route": key, "status": response.status_code, "queries": stats.queries,
+               "db_ms": round(stats.db_time * 1000, 2), "total_ms": round(total * 1000, 2)},
+    )
+
+    budget = budget_for(key)
+    if budget and stats.queries > budget:
+        message = f"{key}: {stats.queries} SQL-запросов при бюджете {budget}"
+        if settings.query_budget_strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
@@ -0,0 +1,98 @@
+# app/reports.py
+import asyncio
+import logging
+from datetime import date
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import BigInteger, Column, Date, Integer, MetaData, Table, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from backend.app.etag import versions_stmt
+from backend.app.models import ReportState
+
+logger = logging.getLogger(__name__)
+
+# Финансовые отчёты поверх материализованных представлений (см. models.REVENUE_VIEW_SQL).
+# Эндпоинты читают только представления — время ответа не зависит от объёма истории.
+
+# Представления описаны в отдельной MetaData, чтобы create_all не пытался создать их как таблицы
+views = MetaData()
+
+revenue_view = Table(
+    "отчет_выручка", views,
+    Column("месяц", Date),
+    Column("этаж", Integer),
+    Column("id_арендатора", Integer),
+    Column("сумма", BigInteger),
+    Column("количество", BigInteger),
+)
+
+ARREARS_BUCKETS = ("не_наступил", "до_30", "от_31_до_60", "от_61_до_90", "свыше_90", "итого", "количество")
+
+arrears_view = Table(
+    "отчет_задолженность", views,
+    Column("этаж", Integer),
+    Column("id_арендатора", Integer),
+    *(Column(name, BigInteger) for name in ARREARS_BUCKETS),
+)
+
+REPORT_NAME = "финансы"
+SOURCE_TABLES = ("платеж", "договор", "офис")
+# Ключ advisory-блокировки: обновляет только один воркер за раз
+REFRESH_LOCK_KEY = 4_180_018
+
+
+def _stamp(db) -> str:
+    versions = dict(db.execute(versions_stmt(SOURCE_TABLES)).all())
+    parts = [f"{table}={versions.get(table, 0)}" for table in SOURCE_TABLES]
+    return ";".join([*parts, date.today().isoformat()])
+
+
+def refresh_reports(db, force: bool = False) -> dict:
+    """
+    Обновляет представления, если изменились исходные таблицы или дата.
+    REFRESH ... CONCURRENTLY не блокирует чтение отчётов на время пересчёта.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}).scalar():
+        db.rollback()
+        return {"обновлено": False, "причина": "обновление уже выполняется"}
+
+    stamp = _stamp(db)
+    state = db.get(ReportState, REPORT_NAME)
+    if not force and state is not None and state.метка == stamp:
+        db.rollback()
+        return {"обновлено": False, "причина": "данные не менялись"}
+
+    for view in (revenue_view, arrears_view):
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+    db.execute(
+        insert(ReportState).values(отчет=REPORT_NAME, метка=stamp)
+        .on_conflict_do_update(index_elements=[ReportState.отчет], set_={"метка": stamp, "обновлено_в": func.now()})
+    )
+    db.commit()
+    return {"обновлено": True, "причина": "принудительно" if force else "изменились данные"}
+
+
+def refreshed_at(db):
+    state = db.get(ReportState, REPORT_NAME)
+    return state.обновлено_в if state else None
+
+
+def _refresh_once():
+    db = SessionLocal()
+    try:
+        return refresh_reports(db)
+    finally:
+        db.close()
+
+
+async def refresh_loop():
+    """Фоновое обновление отчётов раз в settings.reports_refresh_seconds (запускается в lifespan)."""
+    while True:
+        await asyncio.sleep(settings.reports_refresh_seconds)
+        try:
+            await run_in_threadpool(_refresh_once)
+        except Exception:
+            logger.exception("Не удалось обновить финансовые отчёты")
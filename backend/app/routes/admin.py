@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.orm import Session
+from typing import List
+
+from backend.app import profiler
+from backend.app.database import engine, async_engine, get_db
+from backend.app.dependencies import require_role
+from backend.app.explain import check_index_usage
+from backend.app.oauth2 import token_cache
+from backend.app.pool import pool_status
+from backend.app.schemes import ProfilerStart
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Администрирование"]
+)
+
+# --------------------------
+# GET состояние пулов соединений (только admin)
+# --------------------------
+@router.get("/db-pool", response_model=dict)
+def get_db_pool_status(
+    current_user = Depends(require_role(["admin"]))
+):
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+# --------------------------
+# GET статистика кэша проверенных токенов (только admin)
+# --------------------------
+@router.get("/token-cache", response_model=dict)
+def get_token_cache_stats(
+    current_user = Depends(require_role(["admin"]))
+):
+    return token_cache.stats()
+
+
+# --------------------------
+# GET проверка индексов по EXPLAIN (только admin)
+# --------------------------
+@router.get("/explain-indexes", response_model=List[dict])
+def get_index_usage(
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    return check_index_usage(db)
+
+
+# --------------------------
+# Профилирование живых запросов (только admin)
+# --------------------------
+@router.post("/profiler", response_model=dict, status_code=status.HTTP_201_CREATED)
+def start_profiler(
+    params: ProfilerStart,
+    current_user = Depends(require_role(["admin"]))
+):
+    # Новая сессия заменяет текущую; снятое к этому моменту сохраняется
+    return profiler.start(params.pattern, params.requests, params.sample_rate, params.interval_ms).info()
+
+
+@router.get("/profiler", response_model=dict)
+def get_profiler_status(
+    current_user = Depends(require_role(["admin"]))
+):
+    session = profiler.current()
+    return {"текущая": session.info() if session else None, "сохранённые": profiler.saved_profiles()}
+
+
+@router.delete("/profiler", response_model=dict)
+def stop_profiler(
+    current_user = Depends(require_role(["admin"]))
+):
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Профилирование не запущено")
+    return session.info()
+
+
+@router.get("/profiler/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query("collapsed", description="collapsed (flamegraph.pl) или speedscope"),
+    current_user = Depends(require_role(["admin"]))
+):
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    if format == "collapsed":
+        return FileResponse(path, media_type="text/plain", filename=f"profile-{profile_id}.txt")
+    if format == "speedscope":
+        info = next((p for p in profiler.saved_profiles() if p["id"] == profile_id), {})
+        with open(path) as f:
+            document = profiler.to_speedscope(f.read(), f"{info.get('pattern', '*')} ({profile_id})", info.get("interval_ms", 1))
+        return JSONResponse(document, headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'
+        })
+    raise HTTPException(status_code=400, detail="Формат должен быть collapsed или speedscope")
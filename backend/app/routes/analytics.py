@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from datetime import date, timedelta
+
+from backend.app import schemes
+from backend.app.database import get_db
+from backend.app.dependencies import require_role
+from backend.app.models import OccupancySnapshot
+from backend.app.occupancy import take_snapshot
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["Аналитика"]
+)
+
+AREA_COLUMNS = ("офисов", "площадь_всего", "площадь_арендуется", "площадь_в_резерве", "площадь_на_обслуживании")
+
+
+# --------------------------
+# GET /analytics/occupancy — ряд заполненности по дням
+# --------------------------
+@router.get("/occupancy", response_model=List[schemes.OccupancyPoint])
+def get_occupancy(
+    date_from: Optional[date] = Query(None, description="Начало периода (по умолчанию — 30 дней назад)"),
+    date_to: Optional[date] = Query(None, description="Конец периода (по умолчанию — сегодня)"),
+    group_by: Literal["building", "floor"] = Query("building", description="По зданию или по этажам"),
+    floor: Optional[int] = Query(None, description="Только этот этаж"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin", "staff"]))
+):
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Начало периода позже конца")
+
+    keys = [OccupancySnapshot.дата]
+    if group_by == "floor":
+        keys.append(OccupancySnapshot.этаж)
+    query = db.query(
+        *keys,
+        *(func.sum(getattr(OccupancySnapshot, name)).label(name) for name in AREA_COLUMNS),
+    ).filter(OccupancySnapshot.дата.between(date_from, date_to))
+    if floor is not None:
+        query = query.filter(OccupancySnapshot.этаж == floor)
+
+    points = []
+    for row in query.group_by(*keys).order_by(*keys):
+        point = row._asdict()
+        busy = point["площадь_арендуется"] + point["площадь_в_резерве"] + point["площадь_на_обслуживании"]
+        point["доля_занято"] = round(busy / point["площадь_всего"], 4) if point["площадь_всего"] else 0.0
+        points.append(point)
+    return points
+
+
+# --------------------------
+# POST /analytics/occupancy/snapshot — снять снимок вручную (обычно это делает cron)
+# --------------------------
+@router.post("/occupancy/snapshot", response_model=dict)
+def create_occupancy_snapshot(
+    day: Optional[date] = Query(None, description="День снимка (по умолчанию — сегодня)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    floors = take_snapshot(db, day)
+    return {"detail": "Снимок сохранён", "этажей": floors}
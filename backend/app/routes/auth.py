@@ -18,6 +18,10 @@ def login(
             detail="Неверные учётные данные"
         )
 
+    # Возвращаем соединение в пул до проверки пароля: она долгая и идёт в пуле процессов,
+    # а нужные поля пользователя уже загружены
+    db.close()
+
     # Проверяем пароль
     if not utils.verify(user_credentials.password, user.hashed_password):
         raise HTTPException(
@@ -1,33 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
-from backend.app import models, schemes
+from backend.app import models, schemes, expand, listing
 from backend.app.database import get_db
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get
+from backend.app.pagination import PageParams
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py)
+ETAG_TABLES = ("бронь",)
+ETAG_INCLUDES = expand.include_tables(models.Booking, expand.BOOKING_INCLUDES)
 
 router = APIRouter(
     prefix="/bookings",
     tags=["Брони"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES, includes=ETAG_INCLUDES))],
 )
 
+# Ограничение в БД, запрещающее пересечение броней одного офиса
+OVERLAP_CONSTRAINT = "бронь_без_пересечений"
+
+
+def commit_booking(db: Session):
+    """Коммит с переводом нарушения OVERLAP_CONSTRAINT в 400."""
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        diag = getattr(e.orig, "diag", None)
+        if diag is not None and diag.constraint_name == OVERLAP_CONSTRAINT:
+            raise HTTPException(status_code=400, detail="Офис уже забронирован на этот период")
+        raise
+
+
+def filter_bookings(query, current_user: schemes.TokenData):
+    """Арендатор видит только свои брони; query — db.query(Booking) или select(Booking)."""
+    if current_user.role == "tenant":
+        query = query.filter(models.Booking.id_арендатора == current_user.tenant_id)
+    return query
+
+
+def check_bookings(bookings, current_user: schemes.TokenData):
+    if current_user.role == "tenant" and not bookings:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="У вас нет забронированных офисов. Чтобы это сделать, перейдите к просмотру офисов"
+        )
+    return bookings
+
+
 @router.get("/", response_model=List[schemes.BookingOut])
 def get_all_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.BOOKING_INCLUDES)),
     db: Session = Depends(get_db),
     current_user: schemes.TokenData = Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    if current_user.role in ["admin", "staff"]:
-        return db.query(models.Booking).all()
-    elif current_user.role == "tenant":
-        tenant_id = current_user.tenant_id
-        user_bookings = db.query(models.Booking).filter(
-            models.Booking.id_арендатора == tenant_id
-        ).all()
-        if not user_bookings:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="У вас нет забронированных офисов. Чтобы это сделать, перейдите к просмотру офисов"
-            )
-        return user_bookings
+    query = filter_bookings(db.query(models.Booking), current_user)
+    bookings = listing.fetch_page(query, schemes.BookingOut, models.Booking.id_брони, include, page, response)
+    check_bookings(bookings, current_user)
+    return listing.page_response(bookings, schemes.BookingOut, include, response)
 
 
 @router.post("/", response_model=schemes.BookingOut, status_code=status.HTTP_201_CREATED)
@@ -52,20 +86,13 @@ def create_booking(
     if booking.окончание_брони < booking.начало_брони:
         raise HTTPException(status_code=400, detail="Дата окончания не может быть раньше даты начала")
 
-    overlap = db.query(models.Booking).filter(
-        models.Booking.id_офиса == booking.id_офиса,
-        models.Booking.начало_брони < booking.окончание_брони,
-        models.Booking.окончание_брони > booking.начало_брони
-    ).first()
-    if overlap:
-        raise HTTPException(status_code=400, detail="Офис уже забронирован на этот период")
-
     new_booking = models.Booking(
         id_арендатора=tenant_id,
         **booking.dict()
     )
     db.add(new_booking)
-    db.commit()
+    # Пересечение периодов проверяет exclusion constraint в БД
+    commit_booking(db)
     db.refresh(new_booking)
     return new_booking
 
@@ -89,19 +116,10 @@ def update_booking(
     if end_date < start_date:
         raise HTTPException(status_code=400, detail="Дата окончания не может быть раньше даты начала")
 
-    conflict = db.query(models.Booking).filter(
-        models.Booking.id_офиса == booking.id_офиса,
-        models.Booking.id_брони != booking_id,
-        models.Booking.начало_брони < end_date,
-        models.Booking.окончание_брони > start_date
-    ).first()
-    if conflict:
-        raise HTTPException(status_code=400, detail="Офис уже забронирован на этот период")
-
     for key, value in updated.dict(exclude_unset=True).items():
         setattr(booking, key, value)
 
-    db.commit()
+    commit_booking(db)
     db.refresh(booking)
     return booking
 
@@ -1,52 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
-from backend.app import models, schemes
+from backend.app import models, schemes, cache, fastjson, export, expand, schedule, listing
 from backend.app.database import get_db
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get
+from backend.app.pagination import PageParams
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py)
+ETAG_TABLES = ("договор",)
+ETAG_INCLUDES = expand.include_tables(models.Contract, expand.CONTRACT_INCLUDES)
 
 router = APIRouter(
     prefix="/contracts",
     tags=["Договоры"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES, includes=ETAG_INCLUDES))],
 )
 
 # =======================
 # GET /contracts — просмотр всех договоров
 # =======================
+def filter_contracts(query, current_user: schemes.TokenData):
+    """Арендатор видит только свои договоры; query — db.query(Contract) или select(Contract)."""
+    if current_user.role == "tenant":
+        query = query.filter(models.Contract.id_арендатора == current_user.tenant_id)
+    return query
+
+
 @router.get("/", response_model=List[schemes.ContractOut])
 def get_contracts(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.CONTRACT_INCLUDES)),
     db: Session = Depends(get_db),
     current_user: schemes.TokenData = Depends(require_role(["admin", "tenant"]))
 ):
-    if current_user.role == "admin":
-        return db.query(models.Contract).all()
-    elif current_user.role == "tenant":
-        return db.query(models.Contract).filter(
-            models.Contract.id_арендатора == current_user.tenant_id
-        ).all()
+    query = filter_contracts(db.query(models.Contract), current_user)
+    contracts = listing.fetch_page(query, schemes.ContractOut, models.Contract.id_договора, include, page, response)
+    return listing.page_response(contracts, schemes.ContractOut, include, response)
 
 
 # =======================
-# GET /contracts/{id} — просмотр конкретного договора
+# GET /contracts/export — потоковая выгрузка договоров (CSV / NDJSON)
 # =======================
-@router.get("/{contract_id}", response_model=schemes.ContractOut)
-def get_contract(
-    contract_id: int,
+@router.get("/export")
+def export_contracts(
+    response: Response,
+    format: str = Query("csv", description="csv или ndjson"),
+    date_from: Optional[date] = Query(None, description="Дата начала договора не раньше"),
+    date_to: Optional[date] = Query(None, description="Дата начала договора не позже"),
     db: Session = Depends(get_db),
     current_user: schemes.TokenData = Depends(require_role(["admin", "tenant"]))
 ):
-    contract = db.query(models.Contract).filter(models.Contract.id_договора == contract_id).first()
+    stmt = select(*fastjson.columns(models.Contract, schemes.ContractOut))
+    if current_user.role == "tenant":
+        stmt = stmt.where(models.Contract.id_арендатора == current_user.tenant_id)
+    if date_from:
+        stmt = stmt.where(models.Contract.дата_начала >= date_from)
+    if date_to:
+        stmt = stmt.where(models.Contract.дата_начала <= date_to)
+
+    stmt = stmt.order_by(models.Contract.id_договора)
+    return export.export_response(db, stmt, list(schemes.ContractOut.model_fields), format, "contracts", response)
+
+
+# =======================
+# GET /contracts/{id} — просмотр конкретного договора
+# =======================
+def check_contract(contract, current_user: schemes.TokenData):
     if not contract:
         raise HTTPException(status_code=404, detail="Договор не найден")
 
     # Проверка доступа
     if current_user.role == "tenant" and contract.id_арендатора != current_user.tenant_id:
         raise HTTPException(status_code=403, detail="Нет доступа к этому договору")
-
     return contract
 
 
+@router.get("/{contract_id}", response_model=schemes.ContractOut)
+def get_contract(
+    contract_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.CONTRACT_INCLUDES)),
+    db: Session = Depends(get_db),
+    current_user: schemes.TokenData = Depends(require_role(["admin", "tenant"]))
+):
+    contract = db.query(models.Contract).options(
+        *expand.load_options(models.Contract, include)
+    ).filter(models.Contract.id_договора == contract_id).first()
+    check_contract(contract, current_user)
+    return listing.item_response(contract, schemes.ContractOut, include, response)
+
+
 # =======================
 # POST /contracts — создание договора
 # (только admin)
@@ -54,6 +102,7 @@ def get_contract(
 @router.post("/", response_model=schemes.ContractOut, status_code=status.HTTP_201_CREATED)
 def create_contract(
     contract: schemes.ContractCreate,
+    with_schedule: bool = Query(False, alias="schedule", description="Сразу создать график ежемесячных платежей"),
     db: Session = Depends(get_db),
     current_user: schemes.TokenData = Depends(require_role(["admin"]))
 ):
@@ -76,14 +125,43 @@ def create_contract(
     db_contract = models.Contract(**contract.dict())
     db.add(db_contract)
 
-    # Меняем статус офиса
+    # Меняем статус офиса. UPDATE идёт с условием на прочитанную версию: если офис
+    # параллельно сдали или изменили, commit получит StaleDataError и ответ 409
+    office_id, floor = office.id_офиса, office.этаж
     office.статус = "арендуется"
 
+    # График платежей — в той же транзакции, что и договор
+    if with_schedule:
+        db.flush()
+        schedule.generate_schedule(db, db_contract.id_договора)
+
     db.commit()
     db.refresh(db_contract)
+    cache.invalidate_office(office_id, ("свободен", floor), ("арендуется", floor))
     return db_contract
 
 
+# =======================
+# POST /contracts/{id}/schedule — достроить график платежей договора
+# (только admin)
+# =======================
+@router.post("/{contract_id}/schedule", response_model=dict)
+def create_contract_schedule(
+    contract_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemes.TokenData = Depends(require_role(["admin"]))
+):
+    db_contract = db.query(models.Contract).filter(models.Contract.id_договора == contract_id).first()
+    if not db_contract:
+        raise HTTPException(status_code=404, detail="Договор не найден")
+    if db_contract.статус != "активен":
+        raise HTTPException(status_code=400, detail="График строится только для действующего договора")
+
+    created = schedule.generate_schedule(db, contract_id)
+    db.commit()
+    return {"добавлено": created}
+
+
 # =======================
 # PUT /contracts/{id} — редактирование договора
 # (только admin)
@@ -105,7 +183,10 @@ def update_contract(
     if end < start:
         raise HTTPException(status_code=400, detail="Дата окончания не может быть раньше даты начала")
 
-    for key, value in updated.dict(exclude_unset=True).items():
+    if updated.версия is not None and updated.версия != db_contract.версия:
+        raise HTTPException(status_code=409, detail="Договор изменён другим пользователем, обновите данные")
+
+    for key, value in updated.dict(exclude_unset=True, exclude={"версия"}).items():
         setattr(db_contract, key, value)
 
     db.commit()
@@ -128,9 +209,13 @@ def delete_contract(
         raise HTTPException(status_code=404, detail="Договор не найден")
 
     # Освобождаем офис, если связан
-    if hasattr(db_contract, "офис") and db_contract.офис:
-        db_contract.офис.статус = "свободен"
+    office = db_contract.офис if hasattr(db_contract, "офис") else None
+    if office:
+        office_id, office_before = office.id_офиса, (office.статус, office.этаж)
+        office.статус = "свободен"
 
     db.delete(db_contract)
     db.commit()
+    if office:
+        cache.invalidate_office(office_id, office_before, ("свободен", office_before[1]))
     return None
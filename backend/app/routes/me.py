@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import Session, joinedload
+from datetime import date
+
+from backend.app import models, schemes, cache
+from backend.app.config import settings
+from backend.app.database import get_db
+from backend.app.dependencies import require_role
+
+router = APIRouter(
+    prefix="/me",
+    tags=["Личный кабинет"]
+)
+
+# Сколько ближайших броней показывать на главной
+DASHBOARD_BOOKINGS_LIMIT = 10
+# Заявки, по которым ещё идёт работа
+OPEN_REQUEST_STATUSES = ("новая", "в работе")
+
+
+def build_dashboard(db: Session, tenant_id: int) -> dict:
+    """Четыре запроса независимо от объёма данных арендатора."""
+    today = date.today()
+
+    # 1. Действующие договоры вместе с офисами
+    contracts = db.query(models.Contract).options(joinedload(models.Contract.офис)).filter(
+        models.Contract.id_арендатора == tenant_id,
+        models.Contract.статус == "активен"
+    ).order_by(models.Contract.дата_окончания).all()
+
+    # 2. Итоги по неоплаченным платежам одним агрегатом
+    overdue = or_(
+        models.Payment.статус == "просрочен",
+        and_(models.Payment.статус == "не оплачен", models.Payment.срок_оплаты < today)
+    )
+    totals = db.query(
+        func.count(),
+        func.coalesce(func.sum(models.Payment.сумма), 0),
+        func.count().filter(overdue),
+        func.coalesce(func.sum(models.Payment.сумма).filter(overdue), 0),
+    ).select_from(models.Payment).join(models.Contract).filter(
+        models.Contract.id_арендатора == tenant_id,
+        models.Payment.статус.in_(["не оплачен", "просрочен"])
+    ).one()
+
+    # 3. Текущие и будущие действующие брони
+    bookings = db.query(models.Booking).options(joinedload(models.Booking.офис)).filter(
+        models.Booking.id_арендатора == tenant_id,
+        models.Booking.статус == "активна",
+        models.Booking.окончание_брони > today
+    ).order_by(models.Booking.начало_брони).limit(DASHBOARD_BOOKINGS_LIMIT).all()
+
+    # 4. Открытые заявки по договорам арендатора
+    requests = db.query(models.Request).join(models.Contract).filter(
+        models.Contract.id_арендатора == tenant_id,
+        models.Request.статус.in_(OPEN_REQUEST_STATUSES)
+    ).order_by(models.Request.дата_подачи.desc(), models.Request.id_заявки.desc()).all()
+
+    return schemes.TenantDashboard(
+        договоры=[schemes.DashboardContract.model_validate(c) for c in contracts],
+        платежи=schemes.PaymentTotals(
+            неоплачено_количество=totals[0],
+            неоплачено_сумма=totals[1],
+            просрочено_количество=totals[2],
+            просрочено_сумма=totals[3],
+        ),
+        брони=[schemes.DashboardBooking.model_validate(b) for b in bookings],
+        заявки=[schemes.RequestOut.model_validate(r) for r in requests],
+    ).model_dump(mode="json")
+
+
+# --------------------------
+# GET /me/dashboard — главная страница арендатора одним запросом
+# --------------------------
+@router.get("/dashboard", response_model=schemes.TenantDashboard)
+def get_dashboard(
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: schemes.TokenData = Depends(require_role(["tenant"]))
+):
+    dashboard = cache.get_cached_dashboard(current_user.tenant_id)
+    if dashboard is None:
+        dashboard = build_dashboard(db, current_user.tenant_id)
+        cache.cache_dashboard(current_user.tenant_id, dashboard)
+
+    response.headers["Cache-Control"] = f"private, max-age={settings.dashboard_cache_ttl}"
+    return dashboard
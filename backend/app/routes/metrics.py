@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from backend.app import metrics
+
+router = APIRouter(
+    tags=["Мониторинг"]
+)
+
+
+# --------------------------
+# GET /metrics — метрики для Prometheus (все воркеры, см. app/metrics.py)
+# --------------------------
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
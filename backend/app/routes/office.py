@@ -1,53 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request, Body
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date, timedelta
+from itertools import groupby
 
 from backend.app.database import get_db
-from backend.app.models import Office
-from backend.app.schemes import OfficeOut, OfficeCreate, OfficeUpdate
+from backend.app.models import Office, Booking, Contract
+from backend.app.schemes import OfficeOut, OfficeCreate, OfficeUpdate, OfficeAvailability, BulkResult
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get, versions_tag
+from backend.app.pagination import PageParams, NEXT_CURSOR_HEADER
+from backend.app import cache, fastjson, bulk, listing
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py);
+# выдача /availability зависит ещё от броней и договоров
+ETAG_TABLES = ("офис", "бронь", "договор")
 
 router = APIRouter(
     prefix="/offices",
-    tags=["Офисы"]
+    tags=["Офисы"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES))],
 )
 
 # --------------------------
 # GET all offices (с фильтрами)
 # --------------------------
+def filter_offices(query, status: Optional[str], floor: Optional[int]):
+    """Фильтры списка офисов; query — db.query(Office) или select(Office)."""
+    if status:
+        query = query.filter(Office.статус == status)
+    if floor:
+        query = query.filter(Office.этаж == floor)
+    return query
+
+
+def cached_office_list(cache_key: str, request: Request, response: Response):
+    """Страница из кэша (курсор следующей — в заголовок) или None при промахе."""
+    cached = cache.get_cached_office_list(cache_key, versions_tag(request))
+    if cached is None:
+        return None
+    if cached["next"]:
+        response.headers[NEXT_CURSOR_HEADER] = cached["next"]
+    return cached["items"]
+
+
+def store_office_list(cache_key: str, rows, request: Request, response: Response) -> list:
+    items = listing.page_dicts(rows, OfficeOut)
+    cache.cache_office_list(cache_key, items, response.headers.get(NEXT_CURSOR_HEADER), versions_tag(request))
+    return items
+
+
+def office_list_response(items: list, response: Response):
+    if not items:
+        raise HTTPException(status_code=404, detail="Офисы не найдены")
+    if fastjson.enabled:
+        return fastjson.json_response(items, response)
+    return items
+
+
 @router.get("/", response_model=List[OfficeOut])
 def get_offices(
+    request: Request,
+    response: Response,
     status: Optional[str] = Query(None, description="Фильтр по статусу офиса (свободен/арендуется)"),
     floor: Optional[int] = Query(None, description="Фильтр по этажу"),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     current_user = Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    query = db.query(Office)
+    cache_key = cache.office_list_key(status, floor, page.limit, page.after)
+    items = cached_office_list(cache_key, request, response)
+    if items is None:
+        query = filter_offices(db.query(Office), status, floor)
+        rows = listing.fetch_page(query, OfficeOut, Office.id_офиса, {}, page, response)
+        items = store_office_list(cache_key, rows, request, response)
+    return office_list_response(items, response)
 
-    if status:
-        query = query.filter(Office.статус == status)
+
+# --------------------------
+# GET свободные периоды офисов в окне [from, to)
+# --------------------------
+def free_intervals(busy, start: date, end: date):
+    """
+    Свободные промежутки окна [start, end) за вычетом занятых интервалов.
+    busy — полуоткрытые интервалы (начало, окончание), отсортированные по началу.
+    """
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start > cursor:
+            free.append({"начало": cursor, "окончание": min(busy_start, end)})
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            return free
+    if cursor < end:
+        free.append({"начало": cursor, "окончание": end})
+    return free
+
+
+@router.get("/availability", response_model=List[OfficeAvailability])
+def get_offices_availability(
+    date_from: date = Query(..., alias="from", description="Начало окна (включительно)"),
+    date_to: date = Query(..., alias="to", description="Конец окна (не включительно)"),
+    floor: Optional[int] = Query(None, description="Фильтр по этажу"),
+    min_area: Optional[int] = Query(None, description="Минимальная площадь"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    if date_to <= date_from:
+        raise HTTPException(status_code=400, detail="Дата окончания должна быть позже даты начала")
+
+    query = db.query(Office)
     if floor:
         query = query.filter(Office.этаж == floor)
+    if min_area:
+        query = query.filter(Office.площадь >= min_area)
+    offices = query.order_by(Office.id_офиса).all()
+    office_ids = [o.id_офиса for o in offices]
 
-    offices = query.all()
-    if not offices:
-        raise HTTPException(status_code=404, detail="Офисы не найдены")
-    return offices
+    # Брони учитываются все, как и в ограничении бронь_без_пересечений; окончание брони не включительно
+    bookings = db.query(Booking.id_офиса, Booking.начало_брони, Booking.окончание_брони).filter(
+        Booking.id_офиса.in_(office_ids),
+        Booking.начало_брони < date_to,
+        Booking.окончание_брони > date_from,
+    )
+    # Действующие договоры; дата окончания договора включительно
+    contracts = db.query(Contract.id_офиса, Contract.дата_начала, Contract.дата_окончания).filter(
+        Contract.id_офиса.in_(office_ids),
+        Contract.статус == "активен",
+        Contract.дата_начала < date_to,
+        Contract.дата_окончания >= date_from,
+    )
+
+    # Занятые интервалы собираем один раз и сортируем по (офис, начало) — дальше один проход
+    busy = [(o, s, e) for o, s, e in bookings]
+    busy += [(o, s, e + timedelta(days=1)) for o, s, e in contracts]
+    busy.sort()
+    busy_by_office = {
+        office_id: [(s, e) for _, s, e in group]
+        for office_id, group in groupby(busy, key=lambda row: row[0])
+    }
+
+    return [
+        {
+            **OfficeOut.model_validate(office).model_dump(),
+            "свободные_периоды": free_intervals(busy_by_office.get(office.id_офиса, []), date_from, date_to),
+        }
+        for office in offices
+    ]
 
 
 # --------------------------
 # GET single office
 # --------------------------
+def store_office(office_id: int, db_office, request: Request) -> Optional[dict]:
+    """Кэширует выдачу офиса; отсутствующий офис кэшируется как None."""
+    office = OfficeOut.model_validate(db_office).model_dump(mode="json") if db_office else None
+    cache.cache_office(office_id, office, versions_tag(request))
+    return office
+
+
+def office_or_404(office: Optional[dict]) -> dict:
+    if office is None:
+        raise HTTPException(status_code=404, detail="Офис не найден")
+    return office
+
+
 @router.get("/{office_id}", response_model=OfficeOut)
 def get_office(
     office_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    office = db.query(Office).filter(Office.id_офиса == office_id).first()
-    if not office:
-        raise HTTPException(status_code=404, detail="Офис не найден")
-    return office
+    hit, office = cache.get_cached_office(office_id, versions_tag(request))
+    if not hit:
+        office = store_office(office_id, db.query(Office).filter(Office.id_офиса == office_id).first(), request)
+    return office_or_404(office)
 
 
 # --------------------------
@@ -67,9 +197,58 @@ def create_office(
     db.add(db_office)
     db.commit()
     db.refresh(db_office)
+    cache.invalidate_office(db_office.id_офиса, (db_office.статус, db_office.этаж))
     return db_office
 
 
+# --------------------------
+# BULK create offices из CSV / NDJSON (только admin)
+# --------------------------
+# Допустимые статусы — как в CheckConstraint модели Office
+OFFICE_STATUSES = ("свободен", "арендуется", "в резерве", "на обслуживании")
+
+
+@router.post("/bulk", response_model=BulkResult)
+def create_offices_bulk(
+    request: Request,
+    body: bytes = Body(..., media_type="text/csv", description="CSV с заголовком или NDJSON с полями OfficeCreate"),
+    strict: bool = Query(False, description="Не загружать ничего, если в файле есть ошибки"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    seen_numbers = set()
+    created = []
+
+    def check_batch(db, rows, errors):
+        # Номер офиса уникален и в базе, и внутри файла
+        numbers = {office.номер_офиса for _, office in rows}
+        existing = {number for number, in db.query(Office.номер_офиса).filter(Office.номер_офиса.in_(numbers))}
+        valid = []
+        for line_no, office in rows:
+            if office.статус not in OFFICE_STATUSES:
+                errors.append({"строка": line_no, "ошибка": f"Недопустимый статус офиса: {office.статус}"})
+            elif office.номер_офиса in existing or office.номер_офиса in seen_numbers:
+                errors.append({"строка": line_no, "ошибка": f"Офис {office.номер_офиса} уже существует"})
+            else:
+                seen_numbers.add(office.номер_офиса)
+                valid.append((line_no, office))
+        return valid
+
+    def insert_batch(db, offices):
+        # Многострочный INSERT ... RETURNING: id нужны, чтобы сбросить кэш офисов
+        result = db.execute(
+            insert(Office).returning(Office.id_офиса, Office.статус, Office.этаж),
+            [office.dict() for office in offices]
+        )
+        created.extend(result.all())
+
+    rows = bulk.parse_rows(body, request.headers.get("content-type"))
+    result = bulk.ingest(db, rows, OfficeCreate, check_batch, insert_batch, strict)
+    if result["загружено"]:
+        cache.invalidate_offices([office_id for office_id, _, _ in created], {(s, f) for _, s, f in created})
+    return result
+
+
 # --------------------------
 # UPDATE office (только admin)
 # --------------------------
@@ -84,11 +263,17 @@ def update_office(
     if not db_office:
         raise HTTPException(status_code=404, detail="Офис не найден")
 
-    for key, value in office.dict(exclude_unset=True).items():
+    # Клиент прислал версию, которую видел, — офис с тех пор изменили
+    if office.версия is not None and office.версия != db_office.версия:
+        raise HTTPException(status_code=409, detail="Офис изменён другим пользователем, обновите данные")
+
+    before = (db_office.статус, db_office.этаж)
+    for key, value in office.dict(exclude_unset=True, exclude={"версия"}).items():
         setattr(db_office, key, value)
 
     db.commit()
     db.refresh(db_office)
+    cache.invalidate_office(office_id, before, (db_office.статус, db_office.этаж))
     return db_office
 
 
@@ -105,7 +290,9 @@ def delete_office(
     if not db_office:
         raise HTTPException(status_code=404, detail="Офис не найден")
 
+    before = (db_office.статус, db_office.этаж)
     db.delete(db_office)
     db.commit()
+    cache.invalidate_office(office_id, before)
     return None
     
@@ -1,56 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Body, Query
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from datetime import date
 
 from backend.app.database import get_db
 from backend.app.models import Payment, Contract
-from backend.app.schemes import PaymentOut, PaymentCreate, PaymentUpdate
+from backend.app.schemes import PaymentOut, PaymentCreate, PaymentUpdate, BulkResult
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get
+from backend.app.pagination import PageParams
+from backend.app import fastjson, bulk, export, expand, schedule, listing
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py)
+ETAG_TABLES = ("платеж", "договор")
+ETAG_INCLUDES = expand.include_tables(Payment, expand.PAYMENT_INCLUDES)
 
 router = APIRouter(
     prefix="/payments",
-    tags=["Платежи"]
+    tags=["Платежи"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES, includes=ETAG_INCLUDES))],
 )
 
+# Сколько платежей помечать просроченными за один UPDATE в check-overdue
+OVERDUE_BATCH_SIZE = 5000
+
 # 🔹 Получить все платежи
+def filter_payments(query, current_user):
+    """query — db.query(Payment) или select(Payment)."""
+    # tenant видит только свои платежи
+    if current_user.role == "tenant":
+        query = query.join(Contract).filter(Contract.id_арендатора == current_user.tenant_id)
+    return query
+
+
 @router.get("/", response_model=List[PaymentOut])
 def get_payments(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.PAYMENT_INCLUDES)),
     db: Session = Depends(get_db),
     current_user = Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    if current_user.role in ["admin", "staff"]:
-        return db.query(Payment).all()
-
-    # tenant видит только свои платежи
-    return (
-        db.query(Payment)
-        .join(Contract)
-        .filter(Contract.id_арендатора == current_user.tenant_id)
-        .all()
-    )
+    query = filter_payments(db.query(Payment), current_user)
+    payments = listing.fetch_page(query, PaymentOut, Payment.id_платежа, include, page, response)
+    return listing.page_response(payments, PaymentOut, include, response)
 
 
-# 🔹 Получить один платеж
-@router.get("/{payment_id}", response_model=PaymentOut)
-def get_payment(
-    payment_id: int,
+# 🔹 Потоковая выгрузка платежей (CSV / NDJSON)
+@router.get("/export")
+def export_payments(
+    response: Response,
+    format: str = Query("csv", description="csv или ndjson"),
+    date_from: Optional[date] = Query(None, description="Срок оплаты не раньше"),
+    date_to: Optional[date] = Query(None, description="Срок оплаты не позже"),
     db: Session = Depends(get_db),
     current_user = Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    payment = db.query(Payment).filter(Payment.id_платежа == payment_id).first()
+    stmt = select(*fastjson.columns(Payment, PaymentOut))
+
+    # tenant выгружает только свои платежи
+    if current_user.role == "tenant":
+        stmt = stmt.join(Contract, Payment.id_договора == Contract.id_договора).where(
+            Contract.id_арендатора == current_user.tenant_id
+        )
+    if date_from:
+        stmt = stmt.where(Payment.срок_оплаты >= date_from)
+    if date_to:
+        stmt = stmt.where(Payment.срок_оплаты <= date_to)
+
+    stmt = stmt.order_by(Payment.id_платежа)
+    return export.export_response(db, stmt, list(PaymentOut.model_fields), format, "payments", response)
+
+
+# 🔹 Получить один платеж
+def check_payment(payment, current_user):
+    """payment загружен вместе с договором."""
     if not payment:
         raise HTTPException(status_code=404, detail="Платеж не найден")
 
     # Проверяем доступ арендатора
     if current_user.role == "tenant":
-        contract = db.query(Contract).filter(Contract.id_договора == payment.id_договора).first()
+        contract = payment.договор
         if not contract or contract.id_арендатора != current_user.tenant_id:
             raise HTTPException(status_code=403, detail="Нет доступа к этому платежу")
-
     return payment
 
 
+@router.get("/{payment_id}", response_model=PaymentOut)
+def get_payment(
+    payment_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.PAYMENT_INCLUDES)),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    # Договор нужен для проверки доступа — берём его тем же запросом
+    payment = db.query(Payment).options(
+        joinedload(Payment.договор), *expand.load_options(Payment, include)
+    ).filter(Payment.id_платежа == payment_id).first()
+    check_payment(payment, current_user)
+    return listing.item_response(payment, PaymentOut, include, response)
+
+
 # 🔹 Создать платеж
 @router.post("/", response_model=PaymentOut, status_code=status.HTTP_201_CREATED)
 def create_payment(
@@ -78,6 +130,55 @@ def create_payment(
     return db_payment
 
 
+# 🔹 Массовая загрузка платежей из CSV / NDJSON — только admin
+# Допустимые статусы — как в CheckConstraint модели Payment
+PAYMENT_STATUSES = ("не оплачен", "оплачен", "просрочен")
+PAYMENT_COPY_COLUMNS = ("id_договора", "срок_оплаты", "сумма", "статус", "дата_платежа")
+
+
+@router.post("/bulk", response_model=BulkResult)
+def create_payments_bulk(
+    request: Request,
+    body: bytes = Body(..., media_type="text/csv", description="CSV с заголовком или NDJSON с полями PaymentCreate"),
+    strict: bool = Query(False, description="Не загружать ничего, если в файле есть ошибки"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    def check_batch(db, rows, errors):
+        # Те же проверки, что и в create_payment, но одним запросом договоров на пачку
+        contract_ids = {payment.id_договора for _, payment in rows}
+        contracts = {
+            contract_id: (start, contract_status)
+            for contract_id, start, contract_status in db.query(
+                Contract.id_договора, Contract.дата_начала, Contract.статус
+            ).filter(Contract.id_договора.in_(contract_ids))
+        }
+        valid = []
+        for line_no, payment in rows:
+            contract = contracts.get(payment.id_договора)
+            if payment.статус not in PAYMENT_STATUSES:
+                error = f"Недопустимый статус платежа: {payment.статус}"
+            elif contract is None:
+                error = "Договор не найден"
+            elif contract[1] == "расторгнут":
+                error = "Нельзя добавить платеж к расторгнутому договору"
+            elif payment.дата_платежа and payment.дата_платежа < contract[0]:
+                error = "Дата платежа не может быть раньше даты начала договора"
+            else:
+                valid.append((line_no, payment))
+                continue
+            errors.append({"строка": line_no, "ошибка": error})
+        return valid
+
+    def insert_batch(db, payments):
+        bulk.copy_rows(db, Payment.__tablename__, PAYMENT_COPY_COLUMNS, (
+            tuple(getattr(payment, column) for column in PAYMENT_COPY_COLUMNS) for payment in payments
+        ))
+
+    rows = bulk.parse_rows(body, request.headers.get("content-type"))
+    return bulk.ingest(db, rows, PaymentCreate, check_batch, insert_batch, strict)
+
+
 # 🔹 Обновить платеж — только admin
 @router.put("/{payment_id}", response_model=PaymentOut)
 def update_payment(
@@ -121,14 +222,45 @@ def check_overdue_payments(
     current_user = Depends(require_role(["admin", "staff"]))
 ):
     today = date.today()
-    overdue = (
-        db.query(Payment)
-        .filter(Payment.дата_платежа < today, Payment.статус == "не оплачен")
-        .all()
+
+    # Одна пачка просроченных платежей; SKIP LOCKED — чтобы не ждать чужие транзакции
+    batch = (
+        select(Payment.id_платежа)
+        .where(Payment.срок_оплаты < today, Payment.статус == "не оплачен")
+        .limit(OVERDUE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Payment)
+        .where(Payment.id_платежа.in_(batch))
+        .values(статус="просрочен")
+        .returning(Payment.id_платежа)
+        .execution_options(synchronize_session=False)
     )
 
-    for pay in overdue:
-        pay.статус = "просрочен"
+    # Обновляем пачками и коммитим каждую, чтобы не держать блокировки на весь хвост
+    updated_ids = []
+    while True:
+        ids = db.execute(stmt).scalars().all()
+        db.commit()
+        updated_ids.extend(ids)
+        if len(ids) < OVERDUE_BATCH_SIZE:
+            break
 
-    db.commit()
-    return {"detail": f"Обновлено {len(overdue)} просроченных платежей"}
+    return {
+        "detail": f"Обновлено {len(updated_ids)} просроченных платежей",
+        "updated": len(updated_ids),
+        "ids": sorted(updated_ids),
+    }
+
+
+# 🔹 Продлить графики платежей всех действующих договоров — только admin
+@router.post("/schedule", response_model=dict)
+def extend_payment_schedules(
+    until: Optional[date] = Query(None, description="Сроки оплаты не позже (по умолчанию — конец следующего месяца)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    until = until or schedule.default_horizon()
+    return {"добавлено": schedule.extend_schedules(db, until), "до": until}
@@ -0,0 +1,204 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from backend.app import models, schemes, cache, expand, listing
+from backend.app.database import get_async_db
+from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get_async, versions_tag
+from backend.app.pagination import PageParams
+from backend.app.routes import office, contract, payment, booking, tenant
+from backend.app.routes import request as request_routes
+
+# Асинхронные версии GET-эндпоинтов.
+# Подключаются в main.py раньше синхронных роутеров (settings.async_routes),
+# поэтому перехватывают те же URL; запись по-прежнему идёт через синхронные роутеры.
+# Параметры пути объявлены как {id:int}, чтобы не перехватывать /offices/availability и т.п.
+# Фильтры, проверки доступа, кэш и выдача — общие с синхронными роутерами
+# (filter_*/check_* в их модулях и backend.app.listing); здесь только асинхронная выборка.
+router = APIRouter()
+
+# ETag: те же наборы таблиц, что и у синхронных роутеров
+VERSIONS_OFFICES = [Depends(conditional_get_async(*office.ETAG_TABLES))]
+VERSIONS_CONTRACTS = [Depends(conditional_get_async(*contract.ETAG_TABLES, includes=contract.ETAG_INCLUDES))]
+VERSIONS_PAYMENTS = [Depends(conditional_get_async(*payment.ETAG_TABLES, includes=payment.ETAG_INCLUDES))]
+VERSIONS_BOOKINGS = [Depends(conditional_get_async(*booking.ETAG_TABLES, includes=booking.ETAG_INCLUDES))]
+VERSIONS_REQUESTS = [Depends(conditional_get_async(*request_routes.ETAG_TABLES, includes=request_routes.ETAG_INCLUDES))]
+VERSIONS_TENANTS = [Depends(conditional_get_async(*tenant.ETAG_TABLES))]
+
+
+# --------------------------
+# Офисы
+# --------------------------
+@router.get("/offices/", response_model=List[schemes.OfficeOut], tags=["Офисы"], dependencies=VERSIONS_OFFICES)
+async def get_offices(
+    request: Request,
+    response: Response,
+    status: Optional[str] = Query(None, description="Фильтр по статусу офиса (свободен/арендуется)"),
+    floor: Optional[int] = Query(None, description="Фильтр по этажу"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    cache_key = cache.office_list_key(status, floor, page.limit, page.after)
+    items = office.cached_office_list(cache_key, request, response)
+    if items is None:
+        stmt = office.filter_offices(select(models.Office), status, floor)
+        rows = await listing.fetch_page_async(db, stmt, schemes.OfficeOut, models.Office.id_офиса, {}, page, response)
+        items = office.store_office_list(cache_key, rows, request, response)
+    return office.office_list_response(items, response)
+
+
+@router.get("/offices/{office_id:int}", response_model=schemes.OfficeOut, tags=["Офисы"], dependencies=VERSIONS_OFFICES)
+async def get_office(
+    office_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    hit, cached = cache.get_cached_office(office_id, versions_tag(request))
+    if not hit:
+        cached = office.store_office(office_id, await db.get(models.Office, office_id), request)
+    return office.office_or_404(cached)
+
+
+# --------------------------
+# Договоры
+# --------------------------
+@router.get("/contracts/", response_model=List[schemes.ContractOut], tags=["Договоры"], dependencies=VERSIONS_CONTRACTS)
+async def get_contracts(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.CONTRACT_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemes.TokenData = Depends(require_role(["admin", "tenant"]))
+):
+    stmt = contract.filter_contracts(select(models.Contract), current_user)
+    contracts = await listing.fetch_page_async(db, stmt, schemes.ContractOut, models.Contract.id_договора, include, page, response)
+    return listing.page_response(contracts, schemes.ContractOut, include, response)
+
+
+@router.get("/contracts/{contract_id:int}", response_model=schemes.ContractOut, tags=["Договоры"], dependencies=VERSIONS_CONTRACTS)
+async def get_contract(
+    contract_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.CONTRACT_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemes.TokenData = Depends(require_role(["admin", "tenant"]))
+):
+    db_contract = await db.get(models.Contract, contract_id, options=expand.load_options(models.Contract, include))
+    contract.check_contract(db_contract, current_user)
+    return listing.item_response(db_contract, schemes.ContractOut, include, response)
+
+
+# --------------------------
+# Платежи
+# --------------------------
+@router.get("/payments/", response_model=List[schemes.PaymentOut], tags=["Платежи"], dependencies=VERSIONS_PAYMENTS)
+async def get_payments(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.PAYMENT_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    stmt = payment.filter_payments(select(models.Payment), current_user)
+    payments = await listing.fetch_page_async(db, stmt, schemes.PaymentOut, models.Payment.id_платежа, include, page, response)
+    return listing.page_response(payments, schemes.PaymentOut, include, response)
+
+
+@router.get("/payments/{payment_id:int}", response_model=schemes.PaymentOut, tags=["Платежи"], dependencies=VERSIONS_PAYMENTS)
+async def get_payment(
+    payment_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.PAYMENT_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    options = [joinedload(models.Payment.договор), *expand.load_options(models.Payment, include)]
+    db_payment = await db.get(models.Payment, payment_id, options=options)
+    payment.check_payment(db_payment, current_user)
+    return listing.item_response(db_payment, schemes.PaymentOut, include, response)
+
+
+# --------------------------
+# Брони
+# --------------------------
+@router.get("/bookings/", response_model=List[schemes.BookingOut], tags=["Брони"], dependencies=VERSIONS_BOOKINGS)
+async def get_all_bookings(
+    response: Response,
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.BOOKING_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemes.TokenData = Depends(require_role(["admin", "tenant", "staff"]))
+):
+    stmt = booking.filter_bookings(select(models.Booking), current_user)
+    bookings = await listing.fetch_page_async(db, stmt, schemes.BookingOut, models.Booking.id_брони, include, page, response)
+    booking.check_bookings(bookings, current_user)
+    return listing.page_response(bookings, schemes.BookingOut, include, response)
+
+
+# --------------------------
+# Заявки
+# --------------------------
+@router.get("/requests/", response_model=List[schemes.RequestOut], tags=["Заявки"], dependencies=VERSIONS_REQUESTS)
+async def get_all_requests(
+    response: Response,
+    status: Optional[str] = Query(None, description="Фильтр по статусу заявки"),
+    contract_id: Optional[int] = Query(None, description="Фильтр по ID договора"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.REQUEST_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_role(["admin", "tenant", "staff"]))
+):
+    stmt = request_routes.filter_requests(select(models.Request), current_user, status, contract_id, date_from, date_to)
+    requests = await listing.fetch_page_async(db, stmt, schemes.RequestOut, models.Request.id_заявки, include, page, response)
+    return listing.page_response(requests, schemes.RequestOut, include, response)
+
+
+@router.get("/requests/{request_id:int}", response_model=schemes.RequestOut, tags=["Заявки"], dependencies=VERSIONS_REQUESTS)
+async def get_request(
+    request_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.REQUEST_INCLUDES)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(require_role(["admin", "tenant", "staff"]))
+):
+    options = [joinedload(models.Request.договор), *expand.load_options(models.Request, include)]
+    req = await db.get(models.Request, request_id, options=options)
+    request_routes.check_request(req, current_user)
+    return listing.item_response(req, schemes.RequestOut, include, response)
+
+
+# --------------------------
+# Арендаторы
+# --------------------------
+@router.get("/tenants/", response_model=List[schemes.TenantOut], tags=["Арендаторы"], dependencies=VERSIONS_TENANTS)
+async def get_all_tenants(
+    response: Response,
+    name: Optional[str] = None,
+    phone: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "staff"]))
+):
+    stmt = tenant.filter_tenants(select(models.Tenant), name, phone)
+    tenants = await listing.fetch_page_async(db, stmt, schemes.TenantOut, models.Tenant.id_арендатора, {}, page, response)
+    return listing.page_response(tenants, schemes.TenantOut, {}, response)
+
+
+@router.get("/tenants/{tenant_id:int}", response_model=schemes.TenantOut, tags=["Арендаторы"], dependencies=VERSIONS_TENANTS)
+async def get_tenant(
+    tenant_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role(["admin", "staff"]))
+):
+    db_tenant = await db.get(models.Tenant, tenant_id)
+    if not db_tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return db_tenant
@@ -24,6 +24,10 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     if existing_tenant:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Арендатор с таким именем и названием компании уже существует")
 
+    # Хешируем до записи, предварительно вернув соединение в пул
+    db.rollback()
+    hashed_password = utils.hash(user_data.password)
+
     # Создаём арендатора
     tenant = Tenant(
         название_компании=user_data.company_name,
@@ -37,7 +41,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Создаём пользователя
     user = User(
         phone=user_data.username,
-        hashed_password=utils.hash(user_data.password),
+        hashed_password=hashed_password,
         role="tenant",
         id_арендатора=tenant.id_арендатора
     )
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import date
+
+from backend.app import schemes
+from backend.app.database import get_db
+from backend.app.dependencies import require_role
+from backend.app.reports import revenue_view, arrears_view, ARREARS_BUCKETS, refresh_reports, refreshed_at
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["Отчёты"]
+)
+
+# Разрезы отчётов: по этажу, по арендатору или итог по зданию
+GROUP_COLUMNS = {"floor": ("этаж",), "tenant": ("id_арендатора",), "total": ()}
+
+
+# --------------------------
+# GET /reports/revenue — выручка по месяцам
+# --------------------------
+@router.get("/revenue", response_model=schemes.RevenueReport)
+def get_revenue(
+    group_by: Literal["floor", "tenant", "total"] = Query("total", description="Разрез: floor, tenant или total"),
+    month_from: Optional[date] = Query(None, description="С месяца (любая дата внутри месяца)"),
+    month_to: Optional[date] = Query(None, description="По месяц (любая дата внутри месяца)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    keys = [revenue_view.c.месяц, *(revenue_view.c[name] for name in GROUP_COLUMNS[group_by])]
+    query = db.query(
+        *keys,
+        func.sum(revenue_view.c.сумма).label("сумма"),
+        func.sum(revenue_view.c.количество).label("количество"),
+    )
+    if month_from:
+        query = query.filter(revenue_view.c.месяц >= month_from.replace(day=1))
+    if month_to:
+        query = query.filter(revenue_view.c.месяц <= month_to.replace(day=1))
+
+    rows = query.group_by(*keys).order_by(*keys).all()
+    return {"обновлено_в": refreshed_at(db), "строки": [row._asdict() for row in rows]}
+
+
+# --------------------------
+# GET /reports/arrears — задолженность с корзинами просрочки 30/60/90
+# --------------------------
+@router.get("/arrears", response_model=schemes.ArrearsReport)
+def get_arrears(
+    group_by: Literal["floor", "tenant", "total"] = Query("floor", description="Разрез: floor, tenant или total"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    keys = [arrears_view.c[name] for name in GROUP_COLUMNS[group_by]]
+    query = db.query(
+        *keys,
+        *(func.coalesce(func.sum(arrears_view.c[name]), 0).label(name) for name in ARREARS_BUCKETS),
+    )
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+
+    rows = query.all()
+    return {"обновлено_в": refreshed_at(db), "строки": [row._asdict() for row in rows]}
+
+
+# --------------------------
+# POST /reports/refresh — пересчитать отчёты сейчас
+# --------------------------
+@router.post("/refresh", response_model=dict)
+def refresh(
+    force: bool = Query(False, description="Пересчитать, даже если данные не менялись"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["admin"]))
+):
+    return refresh_reports(db, force)
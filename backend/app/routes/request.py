@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import date
 
@@ -7,26 +7,26 @@ from backend.app.database import get_db
 from backend.app.models import Request, Contract, Office
 from backend.app.schemes import RequestOut, RequestCreate, RequestUpdate
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get
+from backend.app.pagination import PageParams
+from backend.app import expand, listing
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py)
+ETAG_TABLES = ("заявка", "договор")
+ETAG_INCLUDES = expand.include_tables(Request, expand.REQUEST_INCLUDES)
 
 router = APIRouter(
     prefix="/requests",
-    tags=["Заявки"]
+    tags=["Заявки"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES, includes=ETAG_INCLUDES))],
 )
 
 # --------------------------
 # GET all requests с фильтрами
 # --------------------------
-@router.get("/", response_model=List[RequestOut])
-def get_all_requests(
-    status: Optional[str] = Query(None, description="Фильтр по статусу заявки"),
-    contract_id: Optional[int] = Query(None, description="Фильтр по ID договора"),
-    date_from: Optional[date] = Query(None),
-    date_to: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
-    current_user=Depends(require_role(["admin", "tenant", "staff"]))
-):
-    query = db.query(Request)
-
+def filter_requests(query, current_user, status: Optional[str], contract_id: Optional[int],
+                    date_from: Optional[date], date_to: Optional[date]):
+    """query — db.query(Request) или select(Request)."""
     if current_user.role == "tenant":
         query = query.join(Contract).filter(Contract.id_арендатора == current_user.id)
 
@@ -38,29 +38,52 @@ def get_all_requests(
         query = query.filter(Request.дата_подачи >= date_from)
     if date_to:
         query = query.filter(Request.дата_подачи <= date_to)
+    return query
 
-    return query.all()
 
-# --------------------------
-# GET single request с info о договоре и офисе
-# --------------------------
-@router.get("/{request_id}", response_model=RequestOut)
-def get_request(
-    request_id: int,
+@router.get("/", response_model=List[RequestOut])
+def get_all_requests(
+    response: Response,
+    status: Optional[str] = Query(None, description="Фильтр по статусу заявки"),
+    contract_id: Optional[int] = Query(None, description="Фильтр по ID договора"),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    page: PageParams = Depends(),
+    include: dict = Depends(expand.include_param(expand.REQUEST_INCLUDES)),
     db: Session = Depends(get_db),
     current_user=Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    req = db.query(Request).filter(Request.id_заявки == request_id).first()
+    query = filter_requests(db.query(Request), current_user, status, contract_id, date_from, date_to)
+    requests = listing.fetch_page(query, RequestOut, Request.id_заявки, include, page, response)
+    return listing.page_response(requests, RequestOut, include, response)
+
+# --------------------------
+# GET single request (договор, офис и арендатор — через include)
+# --------------------------
+def check_request(req, current_user):
+    """req загружена вместе с договором."""
     if not req:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
 
     if current_user.role == "tenant" and req.договор.id_арендатора != current_user.id:
         raise HTTPException(status_code=403, detail="Нет доступа к этой заявке")
+    return req
 
-    # Подгружаем информацию о договоре и офисе
-    req.офис = req.договор.офис if hasattr(req.договор, "офис") else None
 
-    return req
+@router.get("/{request_id}", response_model=RequestOut)
+def get_request(
+    request_id: int,
+    response: Response,
+    include: dict = Depends(expand.include_param(expand.REQUEST_INCLUDES)),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_role(["admin", "tenant", "staff"]))
+):
+    # Договор нужен для проверки доступа — берём его тем же запросом
+    req = db.query(Request).options(
+        joinedload(Request.договор), *expand.load_options(Request, include)
+    ).filter(Request.id_заявки == request_id).first()
+    check_request(req, current_user)
+    return listing.item_response(req, RequestOut, include, response)
 
 # --------------------------
 # CREATE request
@@ -94,7 +117,7 @@ def update_request(
     db: Session = Depends(get_db),
     current_user=Depends(require_role(["admin", "tenant", "staff"]))
 ):
-    req = db.query(Request).filter(Request.id_заявки == request_id).first()
+    req = db.query(Request).options(joinedload(Request.договор)).filter(Request.id_заявки == request_id).first()
     if not req:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
 
@@ -128,7 +151,7 @@ def delete_request(
     db: Session = Depends(get_db),
     current_user=Depends(require_role(["admin", "tenant"]))
 ):
-    req = db.query(Request).filter(Request.id_заявки == request_id).first()
+    req = db.query(Request).options(joinedload(Request.договор)).filter(Request.id_заявки == request_id).first()
     if not req:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
 
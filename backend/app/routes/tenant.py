@@ -1,26 +1,26 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, func, literal
 from typing import List, Optional
-from backend.app import models, schemes, database
+from backend.app import models, schemes, database, listing
 from backend.app.dependencies import require_role
+from backend.app.etag import conditional_get
+from backend.app.pagination import PageParams
+
+# Таблицы выдачи для ETag (те же у асинхронных версий в read_async.py)
+ETAG_TABLES = ("арендатор",)
 
 router = APIRouter(
     prefix="/tenants",
-    tags=["Арендаторы"]
+    tags=["Арендаторы"],
+    dependencies=[Depends(conditional_get(*ETAG_TABLES))],
 )
 
 # --------------------------
 # GET /tenants — список арендаторов с фильтрами
 # --------------------------
-@router.get("/", response_model=List[schemes.TenantOut])
-def get_all_tenants(
-    name: Optional[str] = None,
-    phone: Optional[str] = None,
-    db: Session = Depends(database.get_db),
-    current_user = Depends(require_role(["admin", "staff"]))
-):
-    query = db.query(models.Tenant)
+def filter_tenants(query, name: Optional[str], phone: Optional[str]):
+    """query — db.query(Tenant) или select(Tenant)."""
     if name:
         query = query.filter(
             or_(
@@ -30,7 +30,58 @@ def get_all_tenants(
         )
     if phone:
         query = query.filter(models.Tenant.телефон.ilike(f"%{phone}%"))
-    return query.all()
+    return query
+
+
+@router.get("/", response_model=List[schemes.TenantOut])
+def get_all_tenants(
+    response: Response,
+    name: Optional[str] = None,
+    phone: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(database.get_db),
+    current_user = Depends(require_role(["admin", "staff"]))
+):
+    query = filter_tenants(db.query(models.Tenant), name, phone)
+    tenants = listing.fetch_page(query, schemes.TenantOut, models.Tenant.id_арендатора, {}, page, response)
+    return listing.page_response(tenants, schemes.TenantOut, {}, response)
+
+# --------------------------
+# GET /tenants/search — нечёткий поиск с ранжированием
+# --------------------------
+def search_condition(q: str):
+    """
+    Условие и оценка для поиска по триграммам (pg_trgm).
+    И ILIKE, и оператор <% обслуживаются GIN-индексами ix_арендатор_*_trgm.
+    """
+    columns = [models.Tenant.название_компании, models.Tenant.контактное_лицо, models.Tenant.телефон]
+    score = func.greatest(*(func.word_similarity(q, column) for column in columns))
+    condition = or_(
+        *(column.ilike(f"%{q}%") for column in columns),
+        *(literal(q).op("<%")(column) for column in columns),
+    )
+    return condition, score
+
+
+@router.get("/search", response_model=List[schemes.TenantSearchResult])
+def search_tenants(
+    q: str = Query(..., min_length=2, description="Название компании, контактное лицо или телефон"),
+    limit: int = Query(10, ge=1, le=50, description="Сколько лучших совпадений вернуть"),
+    db: Session = Depends(database.get_db),
+    current_user = Depends(require_role(["admin", "staff"]))
+):
+    condition, score = search_condition(q)
+    rows = (
+        db.query(models.Tenant, score)
+        .filter(condition)
+        .order_by(score.desc(), models.Tenant.id_арендатора)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {**schemes.TenantOut.model_validate(tenant).model_dump(), "сходство": round(similarity, 3)}
+        for tenant, similarity in rows
+    ]
 
 # --------------------------
 # GET /tenants/{id} — конкретный арендатор
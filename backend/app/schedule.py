@@ -0,0 +1,73 @@
+# app/schedule.py
+"""
+График ежемесячных платежей по договорам (таблица платеж).
+
+    python -m backend.app.schedule              # продлить графики до конца следующего месяца (для cron)
+    python -m backend.app.schedule 2027-12-31   # продлить графики до указанной даты
+
+Платёж на каждый месяц договора: срок_оплаты — дата_начала плюс k месяцев
+(31 января → 28/29 февраля → 31 марта), сумма — стоимость договора.
+Месяц, в котором у договора уже есть платёж (в том числе внесённый вручную),
+пропускается, поэтому повторный запуск ничего не дублирует.
+"""
+import sys
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Один INSERT ... SELECT на все договоры: generate_series по номерам месяцев,
+# NOT EXISTS опирается на индекс ix_платеж_договор_срок
+SCHEDULE_SQL = text("""
+INSERT INTO платеж (id_договора, срок_оплаты, сумма, статус)
+SELECT д.id_договора, г.срок, д.стоимость, 'не оплачен'
+FROM договор д
+CROSS JOIN LATERAL (
+    SELECT (д.дата_начала + k * interval '1 month')::date AS срок
+    FROM generate_series(
+        0,
+        (extract(year FROM age(д.дата_окончания, д.дата_начала)) * 12
+         + extract(month FROM age(д.дата_окончания, д.дата_начала)))::int
+    ) AS k
+) г
+WHERE д.статус = 'активен'
+  AND (CAST(:contract_id AS integer) IS NULL OR д.id_договора = :contract_id)
+  AND (CAST(:until AS date) IS NULL OR г.срок <= :until)
+  AND NOT EXISTS (
+      SELECT 1 FROM платеж п
+      WHERE п.id_договора = д.id_договора
+        AND п.срок_оплаты >= date_trunc('month', г.срок)::date
+        AND п.срок_оплаты < (date_trunc('month', г.срок) + interval '1 month')::date
+  )
+""")
+
+
+def default_horizon(today: date = None) -> date:
+    """Последний день следующего месяца — горизонт ежемесячного выставления счетов."""
+    today = today or date.today()
+    first_of_next = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return (first_of_next + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def generate_schedule(db: Session, contract_id: int) -> int:
+    """Полный график действующего договора до дата_окончания. Не коммитит — вызывается внутри транзакции."""
+    return db.execute(SCHEDULE_SQL, {"contract_id": contract_id, "until": None}).rowcount
+
+
+def extend_schedules(db: Session, until: Optional[date] = None) -> int:
+    """Продлевает графики всех действующих договоров до until одним запросом. Возвращает число новых платежей."""
+    result = db.execute(SCHEDULE_SQL, {"contract_id": None, "until": until or default_horizon()})
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from backend.app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        until = date.fromisoformat(sys.argv[1]) if len(sys.argv) == 2 else None
+        print(f"Платежей добавлено: {extend_schedules(db, until)}")
+    finally:
+        db.close()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, constr, conint
-from datetime import date
+from pydantic import BaseModel, Field, constr, conint, confloat
+from datetime import date, datetime
 from typing import Optional, List
 
 
@@ -25,6 +25,9 @@ class TenantOut(TenantBase):
     class Config:
         from_attributes = True
 
+class TenantSearchResult(TenantOut):
+    сходство: float
+
 
 # Офис
 
@@ -44,13 +47,23 @@ class OfficeUpdate(BaseModel):
     площадь: Optional[conint(gt=0)]
     стоимость: Optional[conint(gt=0)]
     статус: Optional[constr(max_length=20)]
+    версия: Optional[int] = None  # ожидаемая версия; при расхождении — 409
 
 class OfficeOut(OfficeBase):
     id_офиса: int
+    версия: int
 
     class Config:
         from_attributes = True
 
+class FreeInterval(BaseModel):
+    # Полуоткрытый интервал [начало, окончание), как у броней
+    начало: date
+    окончание: date
+
+class OfficeAvailability(OfficeOut):
+    свободные_периоды: List[FreeInterval]
+
 
 # Договор
 
@@ -70,10 +83,12 @@ class ContractUpdate(BaseModel):
     дата_окончания: Optional[date]
     стоимость: Optional[conint(gt=0)]
     статус: Optional[constr(max_length=20)]
+    версия: Optional[int] = None  # ожидаемая версия; при расхождении — 409
 
 class ContractOut(ContractBase):
     id_договора: int
     дата_заключения: date
+    версия: int
     class Config:
         from_attributes = True
 
@@ -153,6 +168,80 @@ class BookingOut(BookingBase):
     class Config:
         from_attributes = True
 
+# Дашборд арендатора
+
+class DashboardContract(ContractOut):
+    офис: OfficeOut
+
+class DashboardBooking(BookingOut):
+    офис: OfficeOut
+
+class PaymentTotals(BaseModel):
+    # «неоплачено» — все неоплаченные платежи, «просрочено» — их часть с истёкшим сроком
+    неоплачено_количество: int
+    неоплачено_сумма: int
+    просрочено_количество: int
+    просрочено_сумма: int
+
+class TenantDashboard(BaseModel):
+    договоры: List[DashboardContract]
+    платежи: PaymentTotals
+    брони: List[DashboardBooking]
+    заявки: List[RequestOut]
+
+
+# Финансовые отчёты
+
+class RevenueRow(BaseModel):
+    месяц: date
+    этаж: Optional[int] = None
+    id_арендатора: Optional[int] = None
+    сумма: int
+    количество: int
+
+class RevenueReport(BaseModel):
+    обновлено_в: Optional[datetime]
+    строки: List[RevenueRow]
+
+class ArrearsRow(BaseModel):
+    этаж: Optional[int] = None
+    id_арендатора: Optional[int] = None
+    не_наступил: int
+    до_30: int
+    от_31_до_60: int
+    от_61_до_90: int
+    свыше_90: int
+    итого: int
+    количество: int
+
+class ArrearsReport(BaseModel):
+    обновлено_в: Optional[datetime]
+    строки: List[ArrearsRow]
+
+
+# Заполненность
+
+class OccupancyPoint(BaseModel):
+    дата: date
+    этаж: Optional[int] = None  # None — по зданию целиком
+    офисов: int
+    площадь_всего: int
+    площадь_арендуется: int
+    площадь_в_резерве: int
+    площадь_на_обслуживании: int
+    доля_занято: float  # арендуется + в резерве + на обслуживании
+
+
+# Массовая загрузка
+
+class BulkRowError(BaseModel):
+    строка: int
+    ошибка: str
+
+class BulkResult(BaseModel):
+    загружено: int
+    ошибки: List[BulkRowError]
+
 #Пользователь
 
 class UserCreate(BaseModel):
@@ -188,3 +277,11 @@ class TokenModel(BaseModel):
 class TokenDataForPersonal(BaseModel):
     role: str
 
+
+# Профилирование живых запросов (/admin/profiler)
+
+class ProfilerStart(BaseModel):
+    pattern: constr(min_length=1, max_length=200) = "*"  # шаблон пути в стиле fnmatch, например /payments*
+    requests: conint(ge=1, le=1000) = 10                   # сколько подходящих запросов снять
+    sample_rate: confloat(gt=0, le=1) = 1.0                # доля подходящих запросов, попадающих в профиль
+    interval_ms: conint(ge=1, le=100) = 5                  # период сэмплирования стеков
@@ -1,9 +1,80 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+from backend.app.config import settings
 
-def hash(password: str):
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=settings.password_hash_rounds,
+)
+
+# Хеширование выполняется в отдельных процессах, чтобы не держать GIL воркера.
+# Семафор ограничивает число ожидающих операций: при всплеске логинов лишние
+# запросы сразу получают 503, а потоки threadpool остаются для остальных эндпоинтов.
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.password_hash_queue)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def start_hash_pool():
+    """Поднимает процессы пула заранее, чтобы первые логины не ждали их запуска."""
+    if settings.password_hash_workers <= 0:
+        return
+    pool = _get_pool()
+    for future in [pool.submit(_hash, "warmup") for _ in range(settings.password_hash_workers)]:
+        future.result()
+
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _hash(password: str):
     return pwd_context.hash(password)
 
+
+def _verify(plain_password, hased_password):
+    return pwd_context.verify(plain_password, hased_password)
+
+
+def _run(func, *args):
+    if settings.password_hash_workers <= 0:
+        return func(*args)
+
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, повторите попытку позже",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return _get_pool().submit(func, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash(password: str):
+    return _run(_hash, password)
+
 def verify(plain_password, hased_password):
-    return pwd_context.verify(plain_password, hased_password)
\ No newline at end of file
+    return _run(_verify, plain_password, hased_password)
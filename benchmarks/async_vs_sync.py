@@ -0,0 +1,137 @@
+"""
+Сравнение пропускной способности синхронного и асинхронного стека.
+
+Поднимает uvicorn дважды (ASYNC_ROUTES=false / true) на одной и той же базе
+и гоняет одинаковую смесь GET-запросов с заданной конкурентностью.
+
+    python -m benchmarks.async_vs_sync --concurrency 200 --duration 15
+
+Нужна доступная PostgreSQL из .env; если офисов нет, скрипт засеет немного данных.
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from backend.app import models, oauth2
+from backend.app.database import Base, SessionLocal, engine
+
+PATHS = ["/offices/", "/offices/1", "/contracts/", "/payments/", "/tenants/"]
+
+
+def seed(offices: int = 200, tenants: int = 50):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.query(models.Office).first():
+            return
+        db.add_all([
+            models.Tenant(название_компании=f"Компания {i}", контактное_лицо=f"Контакт {i}", телефон=f"+7900{i:07d}")
+            for i in range(tenants)
+        ])
+        db.add_all([
+            models.Office(номер_офиса=f"{i}", этаж=1 + i % 10, площадь=20 + i % 80, стоимость=30000 + i, статус="свободен")
+            for i in range(offices)
+        ])
+        db.flush()
+        start = datetime.date.today().replace(day=1)
+        for i in range(tenants):
+            contract = models.Contract(
+                id_арендатора=i + 1, id_офиса=i + 1, дата_начала=start,
+                дата_окончания=start + datetime.timedelta(days=365), стоимость=30000, статус="активен"
+            )
+            db.add(contract)
+            db.flush()
+            db.add_all([
+                models.Payment(id_договора=contract.id_договора, срок_оплаты=start + datetime.timedelta(days=30 * m),
+                               сумма=30000, статус="не оплачен")
+                for m in range(12)
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def drive(base_url: str, token: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    r = await client.get(PATHS[i % len(PATHS)])
+                    if r.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return latencies, errors
+
+
+def run_server(port: int, **env_overrides):
+    """
+    Запускает uvicorn с приложением; env_overrides переопределяют настройки (ASYNC_ROUTES=...).
+    bool передаются как true/false, остальное — как есть (SECRET_KEY, QUERY_BUDGETS, пути чувствительны к регистру).
+    """
+    env = dict(os.environ, **{
+        name: str(value).lower() if isinstance(value, bool) else str(value)
+        for name, value in env_overrides.items()
+    })
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("uvicorn не запустился")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    seed()
+    token = oauth2.create_access_token({"user_id": 1, "tenant_id": None, "user_role": "admin"})
+
+    print(f"{'стек':<6} {'req/s':>9} {'p50 мс':>8} {'p99 мс':>8} {'ошибки':>7}")
+    for async_routes in (False, True):
+        proc = run_server(args.port, ASYNC_ROUTES=async_routes)
+        try:
+            latencies, errors = asyncio.run(
+                drive(f"http://127.0.0.1:{args.port}", token, args.concurrency, args.duration)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{'async' if async_routes else 'sync':<6} {len(latencies) / args.duration:>9.0f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Всплеск логинов и его влияние на остальные эндпоинты.
+
+Поднимает uvicorn дважды: с хешированием паролей прямо в обработчике
+(PASSWORD_HASH_WORKERS=0) и в пуле процессов. В обоих прогонах одновременно
+идут логины и чтение /offices/; для каждого выводятся пропускная способность
+логинов, число отказов 503 и задержки /offices/.
+
+    python -m benchmarks.login_storm --logins 50 --readers 10 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from backend.app import models, oauth2, utils
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from benchmarks.async_vs_sync import run_server, seed
+
+PASSWORD = "benchmark-password"
+USERS = 20
+
+
+def seed_users():
+    seed()
+    db = SessionLocal()
+    try:
+        if db.query(models.User).filter(models.User.phone.like("bench-%")).first():
+            return
+        hashed = utils.pwd_context.hash(PASSWORD)
+        db.add_all([
+            models.User(phone=f"bench-{i}", hashed_password=hashed, role="staff")
+            for i in range(USERS)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def storm(base_url: str, logins: int, readers: int, duration: float):
+    token = oauth2.create_access_token({"user_id": 1, "tenant_id": None, "user_role": "admin"})
+    deadline = time.perf_counter() + duration
+    result = {"login_ok": 0, "login_503": 0, "read_latencies": []}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def login_worker(n: int):
+            while time.perf_counter() < deadline:
+                r = await client.post("/login", data={"username": f"bench-{n % USERS}", "password": PASSWORD})
+                if r.status_code == 200:
+                    result["login_ok"] += 1
+                elif r.status_code == 503:
+                    result["login_503"] += 1
+                    await asyncio.sleep(0.05)
+
+        async def read_worker():
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/offices/", headers=headers)
+                result["read_latencies"].append(time.perf_counter() - started)
+
+        await asyncio.gather(
+            *(login_worker(n) for n in range(logins)),
+            *(read_worker() for _ in range(readers)),
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50, help="параллельных клиентов, логинящихся в цикле")
+    parser.add_argument("--readers", type=int, default=10, help="параллельных клиентов, читающих /offices/")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=settings.password_hash_workers or 2)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    seed_users()
+
+    print(f"{'хеширование':<14} {'логин/с':>8} {'503':>6} {'/offices p50 мс':>16} {'/offices p99 мс':>16}")
+    for workers in (0, args.workers):
+        proc = run_server(args.port, PASSWORD_HASH_WORKERS=workers)
+        try:
+            result = asyncio.run(storm(f"http://127.0.0.1:{args.port}", args.logins, args.readers, args.duration))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        reads = sorted(result["read_latencies"])
+        p99 = reads[int(len(reads) * 0.99) - 1] if reads else 0.0
+        p50 = statistics.median(reads) if reads else 0.0
+        label = "inline" if workers == 0 else f"pool x{workers}"
+        print(f"{label:<14} {result['login_ok'] / args.duration:>8.1f} {result['login_503']:>6} "
+              f"{p50 * 1000:>16.1f} {p99 * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Нагрузочный прогон API: засев базы нужного масштаба, реалистичные смеси запросов,
+пропускная способность и p50/p95/p99 по маршрутам, результаты в JSON.
+
+    python -m benchmarks.suite run --scale medium --reset --scenario all --duration 20
+    python -m benchmarks.suite run --scenario dashboard --concurrency 100 --env FAST_LISTS=true
+    python -m benchmarks.suite compare benchmarks/results/old.json benchmarks/results/new.json
+
+Приложение (backend.app.main:app) запускается в uvicorn на той PostgreSQL, что
+указана в .env или переменных окружения (DATABASE_NAME=crm_bench ...). Подойдёт любая
+локальная PostgreSQL 13+, например:
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+
+Берите отдельную базу: --reset пересоздаёт схему public целиком. Без --reset
+непустая база используется как есть, а её объём записывается в результаты.
+
+Смеси (--scenario):
+    dashboard — арендаторы опрашивают /me/dashboard, свои платежи и договоры;
+    admin     — списки, выдача с include, поиск арендаторов, отчёты и аналитика;
+    booking   — всплески создания броней вперемешку с /offices/availability;
+    login     — шторм логинов (pbkdf2) на фоне чтения /offices/;
+    all       — все смеси по очереди.
+
+Результат пишется в benchmarks/results/<время>-<коммит>-<масштаб>.json.
+compare сравнивает два файла и завершается с кодом 1, если у какого-то маршрута
+p95 вырос или пропускная способность упала больше чем на --threshold.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import text
+
+from backend.app import models, oauth2, utils, schedule, occupancy, reports
+from backend.app.database import Base, SessionLocal, engine
+from benchmarks.async_vs_sync import run_server
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PASSWORD = "benchmark-password"
+LOGIN_USERS = 20
+
+# Доля арендаторов с действующим договором и с будущей бронью; офисов вдвое больше арендаторов
+SCALES = {
+    "small": {"tenants": 100, "months": 12},
+    "medium": {"tenants": 1000, "months": 24},
+    "large": {"tenants": 10000, "months": 36},
+}
+CONTRACT_SHARE = 0.8
+BOOKING_SHARE = 0.2
+
+
+# --------------------------
+# Засев
+# --------------------------
+def reset_schema():
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    Base.metadata.create_all(bind=engine)
+
+
+def seed(scale: str):
+    """Детерминированный засев набором INSERT ... SELECT; в пустой схеме id идут с 1."""
+    tenants, months = SCALES[scale]["tenants"], SCALES[scale]["months"]
+    offices, contracts = tenants * 2, int(tenants * CONTRACT_SHARE)
+    today = datetime.date.today()
+    start = (today.replace(day=1) - datetime.timedelta(days=30 * months)).replace(day=1)
+
+    db = SessionLocal()
+    try:
+        db.execute(text("""
+            INSERT INTO арендатор (название_компании, контактное_лицо, телефон)
+            SELECT 'Компания ' || g, 'Контакт ' || g, '+7' || lpad(g::text, 10, '0')
+            FROM generate_series(1, :n) g
+        """), {"n": tenants})
+        db.execute(text("""
+            INSERT INTO офис (номер_офиса, этаж, площадь, стоимость, статус)
+            SELECT g::text, 1 + g % 20, 20 + g % 80, 30000 + g % 50 * 100,
+                   CASE WHEN g <= :contracts THEN 'арендуется' ELSE 'свободен' END
+            FROM generate_series(1, :n) g
+        """), {"n": offices, "contracts": contracts})
+        db.execute(text("""
+            INSERT INTO договор (id_арендатора, id_офиса, дата_начала, дата_окончания, стоимость, статус)
+            SELECT g, g, :start, :start + interval '1 month' * (:months + 12), 30000 + g % 50 * 100, 'активен'
+            FROM generate_series(1, :n) g
+        """), {"n": contracts, "start": start, "months": months})
+        db.commit()
+
+        # Платежи по графику до конца следующего месяца; старые в основном оплачены
+        schedule.extend_schedules(db)
+        db.execute(text("""
+            UPDATE платеж SET статус = 'оплачен', дата_платежа = срок_оплаты
+            WHERE срок_оплаты < current_date - 30 AND id_платежа % 10 <> 0
+        """))
+        db.execute(text("""
+            INSERT INTO заявка (id_договора, статус, текст_заявки)
+            SELECT c, (ARRAY['новая', 'в работе', 'выполнена', 'отклонена'])[1 + (c + k) % 4], 'Заявка ' || k
+            FROM generate_series(1, :n) c, generate_series(1, 3) k
+        """), {"n": contracts})
+        db.execute(text("""
+            INSERT INTO бронь (id_арендатора, id_офиса, начало_брони, окончание_брони, статус)
+            SELECT g, :contracts + g, current_date + 10 + g % 60, current_date + 40 + g % 60, 'активна'
+            FROM generate_series(1, :n) g
+        """), {"n": int(tenants * BOOKING_SHARE), "contracts": contracts})
+
+        hashed = utils.pwd_context.hash(PASSWORD)
+        db.add(models.User(phone="bench-admin", hashed_password=hashed, role="admin"))
+        db.add_all([
+            models.User(phone=f"bench-{i}", hashed_password=hashed, role="staff") for i in range(LOGIN_USERS)
+        ])
+        db.commit()
+
+        occupancy.take_snapshots(db, today - datetime.timedelta(days=90), today)
+        reports.refresh_reports(db, force=True)
+    finally:
+        db.close()
+
+
+def data_counts() -> dict:
+    db = SessionLocal()
+    try:
+        return {
+            table: db.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ("арендатор", "офис", "договор", "платеж", "заявка", "бронь")
+        }
+    finally:
+        db.close()
+
+
+# --------------------------
+# Смеси запросов
+# --------------------------
+# Операция: (метка маршрута, вес, построитель запроса (ctx, номер клиента, номер запроса) -> kwargs httpx)
+def _tenant(ctx, n, i):
+    tenant_id = 1 + (n * 7919 + i) % ctx["contracts"]
+    return tenant_id, {"Authorization": f"Bearer {ctx['tenant_tokens'][tenant_id - 1]}"}
+
+
+def _admin(ctx):
+    return {"Authorization": f"Bearer {ctx['admin_token']}"}
+
+
+def _window(i, days=30):
+    start = datetime.date.today() + datetime.timedelta(days=7 + i % 180)
+    return start.isoformat(), (start + datetime.timedelta(days=days)).isoformat()
+
+
+def _booking(ctx, n, i):
+    tenant_id, headers = _tenant(ctx, n, i)
+    start, end = _window(n * 31 + i, days=7)
+    office_id = ctx["contracts"] + 1 + (n * 104729 + i) % (ctx["offices"] - ctx["contracts"])
+    return {"method": "POST", "url": "/bookings/", "headers": headers,
+            "json": {"id_офиса": office_id, "начало_брони": start, "окончание_брони": end, "статус": "активна"}}
+
+
+def _availability(ctx, n, i):
+    start, end = _window(i)
+    return {"method": "GET", "url": "/offices/availability",
+            "params": {"from": start, "to": end, "floor": 1 + i % 20}, "headers": _admin(ctx)}
+
+
+SCENARIOS = {
+    "dashboard": {
+        "concurrency": 50,
+        "ops": [
+            ("GET /me/dashboard", 6, lambda ctx, n, i: {"method": "GET", "url": "/me/dashboard", "headers": _tenant(ctx, n, i)[1]}),
+            ("GET /payments/", 2, lambda ctx, n, i: {"method": "GET", "url": "/payments/", "headers": _tenant(ctx, n, i)[1]}),
+            ("GET /contracts/", 1, lambda ctx, n, i: {"method": "GET", "url": "/contracts/", "params": {"include": "office"}, "headers": _tenant(ctx, n, i)[1]}),
+            ("GET /requests/", 1, lambda ctx, n, i: {"method": "GET", "url": "/requests/", "headers": _tenant(ctx, n, i)[1]}),
+        ],
+    },
+    "admin": {
+        "concurrency": 20,
+        "ops": [
+            ("GET /offices/", 3, lambda ctx, n, i: {"method": "GET", "url": "/offices/", "params": {"floor": 1 + i % 20}, "headers": _admin(ctx)}),
+            ("GET /offices/availability", 2, _availability),
+            ("GET /contracts/", 2, lambda ctx, n, i: {"method": "GET", "url": "/contracts/", "params": {"include": "office,tenant"}, "headers": _admin(ctx)}),
+            ("GET /payments/", 2, lambda ctx, n, i: {"method": "GET", "url": "/payments/", "params": {"limit": 500}, "headers": _admin(ctx)}),
+            ("GET /tenants/search", 1, lambda ctx, n, i: {"method": "GET", "url": "/tenants/search", "params": {"q": f"Компания {1 + i % ctx['tenants']}"}, "headers": _admin(ctx)}),
+            ("GET /reports/arrears", 1, lambda ctx, n, i: {"method": "GET", "url": "/reports/arrears", "params": {"group_by": "tenant"}, "headers": _admin(ctx)}),
+            ("GET /analytics/occupancy", 1, lambda ctx, n, i: {"method": "GET", "url": "/analytics/occupancy", "params": {"group_by": "floor"}, "headers": _admin(ctx)}),
+        ],
+    },
+    "booking": {
+        # Клиент шлёт пачку из 10 запросов подряд и делает паузу: всплески, а не ровный поток
+        "concurrency": 30,
+        "burst": (10, 0.5),
+        "ops": [
+            ("POST /bookings/", 3, _booking),
+            ("GET /offices/availability", 1, _availability),
+            ("GET /bookings/", 1, lambda ctx, n, i: {"method": "GET", "url": "/bookings/", "headers": _tenant(ctx, n, i)[1]}),
+        ],
+    },
+    "login": {
+        "concurrency": 60,
+        "ops": [
+            ("POST /login", 5, lambda ctx, n, i: {"method": "POST", "url": "/login", "data": {"username": f"bench-{(n + i) % LOGIN_USERS}", "password": PASSWORD}}),
+            ("GET /offices/", 1, lambda ctx, n, i: {"method": "GET", "url": "/offices/", "headers": _admin(ctx)}),
+        ],
+    },
+}
+
+
+def make_context() -> dict:
+    counts = data_counts()
+    contracts = max(counts["договор"], 1)
+    return {
+        "tenants": counts["арендатор"],
+        "offices": counts["офис"],
+        "contracts": contracts,
+        "admin_token": oauth2.create_access_token({"user_id": 1, "tenant_id": None, "user_role": "admin"}),
+        # Токены проверяются без обращения к БД, поэтому достаточно выпустить их на id арендаторов
+        "tenant_tokens": [
+            oauth2.create_access_token({"user_id": 100000 + t, "tenant_id": t, "user_role": "tenant"})
+            for t in range(1, contracts + 1)
+        ],
+    }
+
+
+async def drive(base_url: str, ctx: dict, scenario: dict, concurrency: int, duration: float) -> dict:
+    """Гоняет смесь duration секунд; возвращает {маршрут: {"latencies": [...], "statuses": {...}, "errors": n}}."""
+    plan = [(label, build) for label, weight, build in scenario["ops"] for _ in range(weight)]
+    burst_size, burst_pause = scenario.get("burst", (0, 0))
+    results = {label: {"latencies": [], "statuses": {}, "errors": 0} for label, _, _ in scenario["ops"]}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker(n: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                label, build = plan[(n + i) % len(plan)]
+                result = results[label]
+                started = time.perf_counter()
+                try:
+                    response = await client.request(**build(ctx, n, i))
+                    code = str(response.status_code)
+                    result["statuses"][code] = result["statuses"].get(code, 0) + 1
+                    if response.status_code >= 500:
+                        result["errors"] += 1
+                except httpx.HTTPError:
+                    result["errors"] += 1
+                result["latencies"].append(time.perf_counter() - started)
+                i += 1
+                if burst_size and i % burst_size == 0:
+                    await asyncio.sleep(burst_pause)
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return results
+
+
+# --------------------------
+# Отчёт
+# --------------------------
+def percentile(ordered, q: float) -> float:
+    """Ближайший ранг по отсортированному списку."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(latencies, duration: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / duration, 2),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+def git_revision() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def print_table(title: str, routes: dict):
+    print(f"\n{title}")
+    print(f"{'маршрут':<30} {'запросов':>9} {'req/s':>8} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'5xx':>5}  коды")
+    for label, stats in routes.items():
+        codes = " ".join(f"{code}:{count}" for code, count in sorted(stats["statuses"].items()))
+        print(f"{label:<30} {stats['requests']:>9} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+              f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>5}  {codes}")
+
+
+def run(args):
+    if args.reset:
+        reset_schema()
+    else:
+        Base.metadata.create_all(bind=engine)
+    if data_counts()["офис"] == 0:
+        print(f"Засев ({args.scale})...")
+        seed(args.scale)
+    else:
+        print("База не пуста — засев пропущен, объём записан в результаты")
+
+    ctx = make_context()
+    env = dict(item.split("=", 1) for item in args.env)
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    result = {
+        "meta": {
+            **git_revision(),
+            "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "scale": args.scale,
+            "data": data_counts(),
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "env": env,
+        },
+        "scenarios": {},
+    }
+
+    proc = run_server(args.port, **env)
+    try:
+        for name in names:
+            scenario = SCENARIOS[name]
+            concurrency = args.concurrency or scenario["concurrency"]
+            if args.warmup:
+                asyncio.run(drive(base_url, ctx, scenario, concurrency, args.warmup))
+            raw = asyncio.run(drive(base_url, ctx, scenario, concurrency, args.duration))
+
+            routes = {
+                label: {**summarize(data["latencies"], args.duration), "errors": data["errors"], "statuses": data["statuses"]}
+                for label, data in raw.items()
+            }
+            total = summarize([latency for data in raw.values() for latency in data["latencies"]], args.duration)
+            result["scenarios"][name] = {"concurrency": concurrency, "total": total, "routes": routes}
+            print_table(f"{name}: {total['rps']:.0f} req/s при {concurrency} клиентах", routes)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{result['meta']['commit']}-{args.scale}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {output}")
+
+
+def compare(args) -> int:
+    """Сравнение двух прогонов; код возврата 1 — есть регрессии."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = 0
+    print(f"{'смесь / маршрут':<42} {'p95 было':>9} {'стало':>9} {'req/s было':>11} {'стало':>9}")
+    for name, scenario in current["scenarios"].items():
+        base_routes = baseline["scenarios"].get(name, {}).get("routes", {})
+        for label, stats in scenario["routes"].items():
+            base = base_routes.get(label)
+            if base is None:
+                continue
+            slower = base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + args.threshold)
+            fewer = base["rps"] and stats["rps"] < base["rps"] * (1 - args.threshold)
+            mark = "  РЕГРЕССИЯ" if slower or fewer else ""
+            regressions += bool(mark)
+            print(f"{name + ' ' + label:<42} {base['p95_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                  f"{base['rps']:>11.1f} {stats['rps']:>9.1f}{mark}")
+    print(f"\nРегрессий: {regressions} (порог {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="засеять базу и прогнать смеси")
+    run_parser.add_argument("--scale", choices=SCALES, default="small")
+    run_parser.add_argument("--reset", action="store_true", help="пересоздать схему public перед засевом")
+    run_parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    run_parser.add_argument("--duration", type=float, default=15.0)
+    run_parser.add_argument("--warmup", type=float, default=3.0, help="секунд прогрева без учёта результатов")
+    run_parser.add_argument("--concurrency", type=int, default=0, help="клиентов (0 — по умолчанию для смеси)")
+    run_parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="настройки сервера, например FAST_LISTS=true")
+    run_parser.add_argument("--port", type=int, default=8767)
+    run_parser.add_argument("--output", help="файл результатов (по умолчанию benchmarks/results/...)")
+
+    compare_parser = commands.add_parser("compare", help="сравнить два файла результатов")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="допустимое ухудшение, доля")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
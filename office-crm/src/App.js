@@ -55,6 +55,25 @@ class ApiService {
     }
   }
 
+  // Списки отдаются страницами: следующая — по курсору из заголовка X-Next-Cursor
+  async requestAll(endpoint) {
+    const items = [];
+    let cursor = null;
+    do {
+      const url = cursor ? `${endpoint}?after=${encodeURIComponent(cursor)}` : endpoint;
+      const response = await fetch(`${API_BASE_URL}${url}`, { headers: this.getHeaders() });
+
+      if (!response.ok) {
+        const error = await response.json();
+        throw new Error(error.detail || 'Ошибка запроса');
+      }
+
+      items.push(...(await response.json()));
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+  }
+
   // Auth
   async register(data) {
     return this.request('/register', {
@@ -89,7 +108,7 @@ class ApiService {
 
   // Offices
   async getOffices() {
-    return this.request('/offices/');
+    return this.requestAll('/offices/');
   }
 
   async getOffice(id) {
@@ -116,7 +135,7 @@ class ApiService {
 
   // Bookings
   async getBookings() {
-    return this.request('/bookings/');
+    return this.requestAll('/bookings/');
   }
 
   async createBooking(data) {
@@ -139,7 +158,7 @@ class ApiService {
 
   // Contracts
   async getContracts() {
-    return this.request('/contracts/');
+    return this.requestAll('/contracts/');
   }
 
   async createContract(data) {
@@ -162,7 +181,7 @@ class ApiService {
 
   // Payments
   async getPayments() {
-    return this.request('/payments/');
+    return this.requestAll('/payments/');
   }
 
   async createPayment(data) {
@@ -178,7 +197,7 @@ class ApiService {
 
   // Requests
   async getRequests() {
-    return this.request('/requests/');
+    return this.requestAll('/requests/');
   }
 
   async createRequest(data) {
@@ -201,7 +220,7 @@ class ApiService {
 
   // Tenants
   async getTenants() {
-    return this.request('/tenants/');
+    return this.requestAll('/tenants/');
   }
 }
 
@@ -0,0 +1,63 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+# Настройки без .env: модули приложения читают settings при импорте.
+# Для тестов с БД переменные DATABASE_* должны указывать на живой PostgreSQL,
+# иначе эти тесты пропускаются.
+for _name, _value in {
+    "DATABASE_HOSTNAME": "127.0.0.1",
+    "DATABASE_PORT": "5432",
+    "DATABASE_PASSWORD": "postgres",
+    "DATABASE_NAME": "crm",
+    "DATABASE_USERNAME": "postgres",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from backend.app.config import settings  # noqa: E402
+from backend.app.database import Base, DATABASE_URL  # noqa: E402
+
+TEST_SCHEMA = "pytest"
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Движок на отдельной схеме pytest: таблицы создаются заново и удаляются после тестов."""
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"options": f"-csearch_path={TEST_SCHEMA},public"},
+    )
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+    except OperationalError:
+        engine.dispose()
+        pytest.skip(f"PostgreSQL недоступен ({settings.database_hostname}:{settings.database_port})")
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {TEST_SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine, autoflush=False, autocommit=False)
+    session = Session()
+    yield session
+    session.rollback()
+    session.close()
+    # Каждый тест начинает с пустых таблиц
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    with db_engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
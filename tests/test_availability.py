@@ -0,0 +1,48 @@
+from datetime import date
+
+from backend.app.routes.office import free_intervals
+
+START, END = date(2024, 1, 1), date(2024, 2, 1)
+
+
+def d(day, month=1):
+    return date(2024, month, day)
+
+
+def spans(free):
+    return [(interval["начало"], interval["окончание"]) for interval in free]
+
+
+def test_no_bookings_whole_window_free():
+    assert spans(free_intervals([], START, END)) == [(START, END)]
+
+
+def test_booking_in_the_middle():
+    assert spans(free_intervals([(d(10), d(15))], START, END)) == [(START, d(10)), (d(15), END)]
+
+
+def test_adjacent_bookings_leave_no_gap():
+    busy = [(d(5), d(10)), (d(10), d(20))]
+    assert spans(free_intervals(busy, START, END)) == [(START, d(5)), (d(20), END)]
+
+
+def test_overlapping_and_nested_bookings_are_merged():
+    busy = [(d(5), d(15)), (d(8), d(12)), (d(14), d(18))]
+    assert spans(free_intervals(busy, START, END)) == [(START, d(5)), (d(18), END)]
+
+
+def test_bookings_clipped_to_window():
+    busy = [(date(2023, 12, 20), d(3)), (d(28), d(10, 2))]
+    assert spans(free_intervals(busy, START, END)) == [(d(3), d(28))]
+
+
+def test_booking_covering_window():
+    assert free_intervals([(date(2023, 12, 1), date(2024, 3, 1))], START, END) == []
+
+
+def test_booking_starting_at_window_end():
+    assert spans(free_intervals([(END, d(10, 2))], START, END)) == [(START, END)]
+
+
+def test_booking_ending_at_window_start():
+    assert spans(free_intervals([(date(2023, 12, 1), START)], START, END)) == [(START, END)]
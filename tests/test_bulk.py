@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+from pydantic import BaseModel
+
+from backend.app import bulk, models
+
+PAYMENT_COLUMNS = ("id_договора", "срок_оплаты", "сумма", "статус")
+
+
+class PaymentRow(BaseModel):
+    id_договора: int
+    срок_оплаты: date
+    сумма: int
+    статус: str
+
+
+def accept_all(db, rows, errors):
+    return rows
+
+
+def copy_payments(db, payments):
+    bulk.copy_rows(db, models.Payment.__tablename__, PAYMENT_COLUMNS, (
+        tuple(getattr(payment, column) for column in PAYMENT_COLUMNS) for payment in payments
+    ))
+
+
+@pytest.fixture
+def contract_id(db_session):
+    tenant = models.Tenant(название_компании="ООО Тест", контактное_лицо="Иванов", телефон="+70000000001")
+    office = models.Office(номер_офиса="101", этаж=1, площадь=20, стоимость=1000, статус="арендуется")
+    db_session.add_all([tenant, office])
+    db_session.flush()
+    contract = models.Contract(
+        id_арендатора=tenant.id_арендатора, id_офиса=office.id_офиса, стоимость=1000, статус="активен",
+        дата_начала=date(2024, 1, 1), дата_окончания=date(2024, 12, 31),
+    )
+    db_session.add(contract)
+    db_session.commit()
+    return contract.id_договора
+
+
+def payment_rows(contract_id, bad_lines):
+    # Строка с несуществующим договором и строка с суммой <= 0 проходят схему, но не БД
+    for line_no in range(1, 8):
+        row = {"id_договора": contract_id, "срок_оплаты": f"2024-01-{line_no:02d}", "сумма": 100, "статус": "не оплачен"}
+        bad = bad_lines.get(line_no, {})
+        # Строка — ошибка разбора файла, как её отдаёт parse_rows
+        yield line_no, bad if isinstance(bad, str) else {**row, **bad}
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_BATCH_SIZE", 3)
+
+
+def test_rows_rejected_by_database_reported_rest_loaded(db_session, contract_id, small_batches):
+    rows = payment_rows(contract_id, {2: {"id_договора": contract_id + 1000}, 6: {"сумма": 0}, 7: "Некорректный JSON"})
+
+    result = bulk.ingest(db_session, rows, PaymentRow, accept_all, copy_payments)
+
+    assert result["загружено"] == 4
+    assert [error["строка"] for error in result["ошибки"]] == [2, 6, 7]
+    assert result["ошибки"][0]["ошибка"].startswith("Отклонено базой данных")
+    loaded = db_session.query(models.Payment.срок_оплаты).order_by(models.Payment.срок_оплаты).all()
+    assert [due.day for due, in loaded] == [1, 3, 4, 5]
+
+
+def test_strict_mode_loads_nothing_on_database_error(db_session, contract_id, small_batches):
+    rows = list(payment_rows(contract_id, {5: {"сумма": -1}}))
+
+    result = bulk.ingest(db_session, rows, PaymentRow, accept_all, copy_payments, strict=True)
+
+    assert result["загружено"] == 0
+    assert [error["строка"] for error in result["ошибки"]] == [5]
+    assert db_session.query(models.Payment).count() == 0
+
+
+def test_clean_upload_loaded_in_batches(db_session, contract_id, small_batches):
+    result = bulk.ingest(db_session, list(payment_rows(contract_id, {})), PaymentRow, accept_all, copy_payments)
+
+    assert result == {"загружено": 7, "ошибки": []}
+    assert db_session.query(models.Payment).count() == 7
@@ -0,0 +1,149 @@
+# Гарантии, которые держит сама БД: непересекающиеся брони (GiST exclusion),
+# оптимистическая блокировка по столбцу версия и счётчики версий таблиц для ETag,
+# на которых пишущие транзакции не ждут друг друга.
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.app import etag, models
+from backend.app.database import get_db
+from backend.app.oauth2 import create_access_token
+from backend.app.routes import office as office_routes
+from backend.app.routes.booking import OVERLAP_CONSTRAINT
+
+
+@pytest.fixture
+def office(db_session):
+    tenant = models.Tenant(название_компании="ООО Тест", контактное_лицо="Иванов", телефон="+70000000001")
+    office = models.Office(номер_офиса="101", этаж=1, площадь=20, стоимость=1000, статус="свободен")
+    db_session.add_all([tenant, office])
+    db_session.commit()
+    return office, tenant
+
+
+def book(db_session, office, tenant, start, end, status="активна"):
+    db_session.add(models.Booking(
+        id_офиса=office.id_офиса, id_арендатора=tenant.id_арендатора,
+        начало_брони=start, окончание_брони=end, статус=status,
+    ))
+    db_session.commit()
+
+
+def test_overlapping_booking_rejected(db_session, office):
+    book(db_session, *office, date(2024, 1, 10), date(2024, 1, 20))
+    with pytest.raises(IntegrityError) as exc:
+        book(db_session, *office, date(2024, 1, 15), date(2024, 1, 25))
+    assert exc.value.orig.diag.constraint_name == OVERLAP_CONSTRAINT
+
+
+def test_adjacent_bookings_allowed(db_session, office):
+    # Период брони полуоткрытый: окончание одной может совпадать с началом следующей
+    book(db_session, *office, date(2024, 1, 10), date(2024, 1, 20))
+    book(db_session, *office, date(2024, 1, 20), date(2024, 1, 30))
+    book(db_session, *office, date(2024, 1, 1), date(2024, 1, 10))
+    assert db_session.query(models.Booking).count() == 3
+
+
+def test_other_office_same_period_allowed(db_session, office):
+    _, tenant = office
+    other = models.Office(номер_офиса="102", этаж=1, площадь=30, стоимость=1500, статус="свободен")
+    db_session.add(other)
+    db_session.commit()
+    book(db_session, *office, date(2024, 1, 10), date(2024, 1, 20))
+    book(db_session, other, tenant, date(2024, 1, 10), date(2024, 1, 20))
+
+
+def test_stale_version_conflicts(db_engine, db_session, office):
+    office_id = office[0].id_офиса
+    other_session = sessionmaker(bind=db_engine)()
+    try:
+        stale = other_session.get(models.Office, office_id)
+
+        fresh = db_session.get(models.Office, office_id)
+        fresh.статус = "арендуется"
+        db_session.commit()
+        assert fresh.версия == 2
+
+        stale.статус = "на ремонте"
+        with pytest.raises(StaleDataError):
+            other_session.commit()
+    finally:
+        other_session.rollback()
+        other_session.close()
+
+
+@pytest.fixture
+def client(db_engine):
+    Session = sessionmaker(bind=db_engine, autoflush=False, autocommit=False)
+
+    def get_test_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(office_routes.router)
+    app.dependency_overrides[get_db] = get_test_db
+    token = create_access_token({"user_id": 1, "tenant_id": None, "user_role": "admin"})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_update_with_old_version_is_409(client, db_session, office):
+    office_id = office[0].id_офиса
+    body = {"номер_офиса": "101", "этаж": 1, "площадь": 20, "статус": "свободен"}
+
+    response = client.put(f"/offices/{office_id}", json={**body, "стоимость": 1100, "версия": 1})
+    assert response.status_code == 200
+    assert response.json()["версия"] == 2
+
+    # Второй клиент видел ещё версию 1
+    response = client.put(f"/offices/{office_id}", json={**body, "стоимость": 1200, "версия": 1})
+    assert response.status_code == 409
+    db_session.expire_all()
+    assert db_session.get(models.Office, office_id).стоимость == 1100
+
+
+def table_version(conn, table):
+    return dict(conn.execute(etag.versions_stmt([table])).all()).get(table, 0)
+
+
+def test_writers_to_different_offices_do_not_wait(db_engine, db_session):
+    db_session.add_all(
+        models.Office(номер_офиса=str(100 + i), этаж=1, площадь=20, стоимость=1000, статус="свободен")
+        for i in range(5)
+    )
+    db_session.commit()
+    with db_engine.connect() as conn:
+        before = table_version(conn, "офис")
+
+    # Все транзакции открыты одновременно; ожидание блокировки счётчика дало бы ошибку lock_timeout
+    writers = [db_engine.connect() for _ in range(5)]
+    try:
+        for office_id, conn in enumerate(writers, start=1):
+            conn.execute(text("SET lock_timeout = '100ms'"))
+            conn.execute(text("UPDATE офис SET стоимость = стоимость + 1 WHERE id_офиса = :id"), {"id": office_id})
+
+        # Свёртка слотов тоже не ждёт пишущих
+        with Session(bind=db_engine) as session:
+            session.execute(text("SET LOCAL lock_timeout = '100ms'"))
+            etag.compact_table_versions(session)
+        for conn in writers:
+            conn.commit()
+    finally:
+        for conn in writers:
+            conn.close()
+
+    with Session(bind=db_engine) as session:
+        etag.compact_table_versions(session)
+    with db_engine.connect() as conn:
+        assert table_version(conn, "офис") == before + 5
+        slots = conn.execute(text("SELECT count(*) FROM версия_таблицы WHERE таблица = 'офис'")).scalar()
+    assert slots == 1
@@ -0,0 +1,37 @@
+import pytest
+from starlette.requests import Request
+
+from backend.app.etag import _matches, versions_tag
+
+ETAG = 'W/"abc123"'
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.mark.parametrize("header", [
+    'W/"abc123"',
+    '"abc123"',
+    '*',
+    '"other", W/"abc123"',
+    '"other" ,  "abc123"',
+])
+def test_matches(header):
+    assert _matches(make_request(header), ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", '"other"', 'W/"abc12"', 'W/"abc1234"'])
+def test_does_not_match(header):
+    assert not _matches(make_request(header), ETAG)
+
+
+def test_versions_tag_sorted_by_table():
+    request = make_request()
+    request.state.table_versions = {"офис": 7, "договор": 3}
+    assert versions_tag(request) == "договор=3,офис=7"
+
+
+def test_versions_tag_without_conditional_get():
+    assert versions_tag(make_request()) == ""
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from backend.app import metrics
+from backend.app.config import settings
+
+
+def _dead_pid() -> int:
+    pid = 2**22 + 1
+    while metrics._pid_alive(pid):
+        pid += 1
+    return pid
+
+
+@pytest.fixture
+def request_metrics(monkeypatch):
+    fresh = metrics.RequestMetrics()
+    monkeypatch.setattr(metrics, "request_metrics", fresh)
+    return fresh
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_observe_buckets(request_metrics):
+    request_metrics.observe("/offices", "GET", 0.004, 200)
+    request_metrics.observe("/offices", "GET", 0.005, 200)
+    request_metrics.observe("/offices", "GET", 30.0, 500)
+
+    series = request_metrics.latency[("/offices", "GET")]
+    assert series[0] == 2   # le=0.005 включительно
+    assert series[-2] == 1  # +Inf
+    assert series[-1] == pytest.approx(30.009)
+    assert request_metrics.responses == {200: 2, 500: 1}
+
+
+def test_snapshot_histogram_is_cumulative(request_metrics):
+    request_metrics.observe("/offices", "GET", 0.02, 200)
+    request_metrics.observe("/offices", "GET", 0.2, 200)
+
+    buckets = {
+        labels["le"]: value for name, labels, value in metrics.snapshot()
+        if name == "http_request_duration_seconds_bucket"
+    }
+    assert buckets["0.01"] == 0
+    assert buckets["0.025"] == 1
+    assert buckets["0.25"] == 2
+    assert buckets["+Inf"] == 2
+
+
+def test_collect_sums_workers_and_skips_dead_gauges(request_metrics, metrics_dir):
+    request_metrics.observe("/offices", "GET", 0.02, 200)
+    request_metrics.in_flight = 1
+    alive, dead = os.getppid(), _dead_pid()
+    for pid, in_flight in ((alive, 2), (dead, 5)):
+        (metrics_dir / f"{pid}.json").write_text(json.dumps([
+            ["http_responses_total", {"code": "200"}, 10],
+            ["http_requests_in_flight", {}, in_flight],
+        ]))
+    (metrics_dir / "junk.json").write_text("[]")
+    (metrics_dir / f"{alive + 1}.json.tmp").write_text("not json")
+
+    totals = metrics.collect()
+    assert totals[("http_responses_total", (("code", "200"),))] == 21
+    assert totals[("http_requests_in_flight", ())] == 3
+
+
+def test_own_snapshot_file_not_counted_twice(request_metrics, metrics_dir):
+    request_metrics.observe("/offices", "GET", 0.02, 200)
+    metrics.write_snapshot()
+
+    assert metrics.collect()[("http_responses_total", (("code", "200"),))] == 1
+
+
+def test_render_groups_samples_under_help(request_metrics, metrics_dir):
+    request_metrics.observe("/offices", "GET", 0.02, 200)
+    text = metrics.render()
+
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_request_duration_seconds_bucket{le="+Inf",method="GET",prefix="/offices"} 1' in text
+    assert 'http_responses_total{code="200"} 1' in text
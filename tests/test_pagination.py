@@ -0,0 +1,58 @@
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("last_id", [0, 1, 99, 2**31 - 1, 10**15])
+def test_cursor_roundtrip(last_id):
+    cursor = encode_cursor(last_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == last_id
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode_cursor(1)[:-2],
+    "eyJpZCI6ImEifQ",  # {"id":"a"}
+    "eyJ4IjoxfQ",      # {"x":1}
+    "WzFd",            # [1]
+])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+app = FastAPI()
+
+
+@app.get("/items")
+def items(page: PageParams = Depends()):
+    return {"limit": page.limit, "after": page.after}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_default_limit_is_bounded(client):
+    assert client.get("/items").json() == {"limit": DEFAULT_PAGE_SIZE, "after": None}
+    assert DEFAULT_PAGE_SIZE <= MAX_PAGE_SIZE
+
+
+def test_cursor_without_limit_uses_default_size(client):
+    response = client.get("/items", params={"after": encode_cursor(42)})
+    assert response.json() == {"limit": DEFAULT_PAGE_SIZE, "after": 42}
+
+
+def test_explicit_limit(client):
+    assert client.get("/items", params={"limit": 5}).json()["limit"] == 5
+    assert client.get("/items", params={"limit": MAX_PAGE_SIZE}).json()["limit"] == MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_range_is_rejected(client, limit):
+    assert client.get("/items", params={"limit": limit}).status_code == 422
@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fastapi.routing
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from backend.app import profiler
+from backend.app.config import settings
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_profile_path_existing(profiles_dir):
+    (profiles_dir / "1700000000000-123.txt").write_text("")
+    assert profiler.profile_path("1700000000000-123") == str(profiles_dir / "1700000000000-123.txt")
+
+
+def test_profile_path_missing(profiles_dir):
+    assert profiler.profile_path("1700000000000-123") is None
+
+
+@pytest.mark.parametrize("profile_id", [
+    "../1700000000000-123",
+    "1700000000000-123/../x",
+    "1700000000000",
+    "1700000000000-",
+    "-123",
+    "1700000000000-12-3",
+    "abc-123",
+    "1" * 40 + "-" + "2" * 40,
+])
+def test_profile_path_rejects_bad_ids(profiles_dir, profile_id):
+    (profiles_dir / f"{profile_id.replace('/', '_')}.txt").write_text("")
+    assert profiler.profile_path(profile_id) is None
+
+
+def test_to_speedscope():
+    collapsed = "GET /a;main (m.py:1);handler (h.py:5) 3\nGET /a;main (m.py:1);other (o.py:9) 1\n"
+    result = profiler.to_speedscope(collapsed, "профиль", 10)
+
+    assert [frame["name"] for frame in result["shared"]["frames"]] == [
+        "GET /a", "main (m.py:1)", "handler (h.py:5)", "other (o.py:9)",
+    ]
+    profile = result["profiles"][0]
+    assert profile["name"] == "профиль"
+    assert profile["samples"] == [[0, 1, 2], [0, 1, 3]]
+    assert profile["weights"] == [30, 10]
+    assert profile["endValue"] == 40
+
+
+def test_to_speedscope_empty():
+    profile = profiler.to_speedscope("", "пусто", 10)["profiles"][0]
+    assert profile["samples"] == [] and profile["endValue"] == 0
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def other_request_work():
+    time.sleep(0.3)
+
+
+def shared_dependency(request: Request):
+    if request.url.path == "/other":
+        other_request_work()
+    else:
+        _busy(0.1)
+
+
+profiled_app = FastAPI()
+profiled_app.add_middleware(profiler.ProfilerMiddleware)
+
+
+@profiled_app.get("/profiled/sync", dependencies=[Depends(shared_dependency)])
+def profiled_sync():
+    _busy(0.1)
+
+
+@profiled_app.get("/profiled/async")
+async def profiled_async():
+    _busy(0.1)
+
+
+@profiled_app.get("/other", dependencies=[Depends(shared_dependency)])
+def other():
+    # Чужие запросы спят, а не крутятся: иначе поток профайлера реже получает GIL
+    time.sleep(0.05)
+
+
+def test_only_marked_requests_are_sampled(profiles_dir):
+    session = profiler.start("/profiled/*", requests=2, sample_rate=1, interval_ms=1)
+    with TestClient(profiled_app) as client:
+        # Запрос к другому маршруту идёт параллельно и выполняет ту же зависимость
+        with ThreadPoolExecutor() as pool:
+            others = [pool.submit(client.get, "/other") for _ in range(4)]
+            time.sleep(0.05)
+            client.get("/profiled/sync")
+            client.get("/profiled/async")
+            for future in others:
+                future.result()
+        # Сессия закрылась по числу запросов; файлы пишет поток профайлера
+        session._thread.join(5)
+
+    assert profiler.current() is None
+    assert fastapi.routing.run_in_threadpool is run_in_threadpool
+    collapsed = (profiles_dir / f"{session.id}.txt").read_text()
+    labels = {line.split(";", 1)[0] for line in collapsed.splitlines()}
+    assert labels == {"GET /profiled/sync", "GET /profiled/async"}
+    assert "profiled_sync" in collapsed and "profiled_async" in collapsed
+    assert "shared_dependency" in collapsed
+    assert "other_request_work" not in collapsed
+
+
+def test_sample_rate_zero_profiles_nothing(profiles_dir):
+    session = profiler.start("*", requests=1, sample_rate=0, interval_ms=1)
+    with TestClient(profiled_app) as client:
+        client.get("/profiled/sync")
+    assert session.remaining == 1
+    assert profiler.stop() is session
+    assert (profiles_dir / f"{session.id}.txt").read_text() == ""
+
+
+def test_threadpool_hook_only_during_session(profiles_dir):
+    assert fastapi.routing.run_in_threadpool is run_in_threadpool
+    session = profiler.start("/nothing", requests=1, sample_rate=1, interval_ms=1)
+    assert fastapi.routing.run_in_threadpool is profiler._run_in_threadpool
+    assert profiler.stop() is session
+    assert fastapi.routing.run_in_threadpool is run_in_threadpool
@@ -0,0 +1,105 @@
+import logging
+import re
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app import querystats
+from backend.app.config import settings
+
+
+def fake_query():
+    """То, что делают события движка вокруг одного cursor.execute."""
+    context = SimpleNamespace()
+    querystats._before_cursor_execute(None, None, "SELECT 1", None, context, False)
+    querystats._after_cursor_execute(None, None, "SELECT 1", None, context, False)
+
+
+app = FastAPI()
+
+
+@app.middleware("http")
+async def query_stats(request, call_next):
+    return await querystats.track(request, call_next)
+
+
+# Синхронный обработчик: выполняется в пуле потоков, счётчик доходит через ContextVar
+@app.get("/items/{item_id}")
+def get_item(item_id: int, queries: int = 0):
+    for _ in range(queries):
+        fake_query()
+    return {"id": item_id}
+
+
+@app.get("/async-items")
+async def get_async_items(queries: int = 0):
+    for _ in range(queries):
+        fake_query()
+    return []
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setattr(settings, "query_budgets", {"GET /items/{item_id}": 2})
+    monkeypatch.setattr(settings, "query_budget_default", 0)
+    monkeypatch.setattr(settings, "query_budget_strict", False)
+    return settings
+
+
+SERVER_TIMING = re.compile(r'^db;dur=\d+\.\d{2};desc="(\d+) queries", total;dur=\d+\.\d{2}$')
+
+
+@pytest.mark.parametrize("url, queries", [
+    ("/items/1?queries=3", 3),
+    ("/async-items?queries=2", 2),
+    ("/async-items", 0),
+])
+def test_server_timing_header(client, url, queries):
+    response = client.get(url)
+    match = SERVER_TIMING.match(response.headers[querystats.SERVER_TIMING_HEADER])
+    assert match and int(match.group(1)) == queries
+
+
+def test_queries_outside_request_not_counted(client):
+    fake_query()
+    assert querystats._current.get() is None
+
+
+def test_within_budget_no_warning(client, budgets, caplog):
+    with caplog.at_level(logging.WARNING, logger=querystats.__name__):
+        assert client.get("/items/1?queries=2").status_code == 200
+    assert not caplog.records
+
+
+def test_over_budget_logs_warning(client, budgets, caplog):
+    with caplog.at_level(logging.WARNING, logger=querystats.__name__):
+        assert client.get("/items/1?queries=3").status_code == 200
+    assert [record.getMessage() for record in caplog.records] == [
+        "GET /items/{item_id}: 3 SQL-запросов при бюджете 2"
+    ]
+
+
+def test_over_budget_strict_raises(client, budgets):
+    budgets.query_budget_strict = True
+    with pytest.raises(querystats.QueryBudgetExceeded):
+        client.get("/items/1?queries=3")
+
+
+def test_default_budget_applies_to_other_routes(client, budgets):
+    budgets.query_budget_strict = True
+    budgets.query_budget_default = 1
+    assert client.get("/async-items?queries=1").status_code == 200
+    with pytest.raises(querystats.QueryBudgetExceeded):
+        client.get("/async-items?queries=2")
+
+
+def test_zero_budget_disables_check(client, budgets):
+    budgets.query_budget_strict = True
+    assert client.get("/async-items?queries=50").status_code == 200